@@ -0,0 +1,172 @@
+import os
+
+# game.py only loads pygame for drawing, but keep it quiet if anything does
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import time
+import numpy as np
+
+from game import (
+    Controls, Terrain,
+    GRAVITY, MAX_TILT_ANGLE, MAX_LANDING_SPEED, FUEL_CONSUMPTION, JUMP_FORCE,
+)
+
+# Lockstep physics for many independent cars on one shared terrain.
+# Every field Car keeps is a NumPy array with one entry per car, and step()
+# applies the rules of Car.update to all of them at once. The tunable
+# constants may be scalars or per-car arrays, so one batch can sweep values.
+class BatchCars:
+    def __init__(self, count, terrain=None, x=100, y=300, gravity=GRAVITY,
+                 max_tilt_angle=MAX_TILT_ANGLE, max_landing_speed=MAX_LANDING_SPEED,
+                 fuel_consumption=FUEL_CONSUMPTION, jump_force=JUMP_FORCE):
+        self.count = count
+        self.terrain = terrain or Terrain()
+        self.gravity = gravity
+        self.max_tilt_angle = max_tilt_angle
+        self.max_landing_speed = max_landing_speed
+        self.fuel_consumption = fuel_consumption
+        self.jump_force = jump_force
+        self.wheel_radius = 20
+        self.wheel_base = 40
+        self.reset(x, y)
+
+    def reset(self, x=100, y=300):
+        n = self.count
+        self.x = np.full(n, x, dtype=np.float64)
+        self.y = np.full(n, y, dtype=np.float64)
+        self.vx = np.zeros(n)
+        self.vy = np.zeros(n)
+        self.angle = np.zeros(n)
+        self.angular_velocity = np.zeros(n)
+        self.wheel_angle = np.zeros(n)
+        self.fuel = np.full(n, 100.0)
+        self.crashed = np.zeros(n, dtype=bool)
+        self.on_ground = np.zeros(n, dtype=bool)
+        self.can_jump = np.ones(n, dtype=bool)
+        self.suspension_front = np.zeros(n)
+        self.suspension_rear = np.zeros(n)
+        self.steps = 0
+
+    @property
+    def active(self):
+        return ~self.crashed & (self.fuel > 0)
+
+    def step(self, controls):
+        # controls: a Controls whose fields are bools or per-car bool arrays.
+        # Returns the per-car "accelerating" mask, like Car.update.
+        alive = ~self.crashed
+        on_ground = self.on_ground
+
+        # Input
+        accelerating = alive & np.asarray(controls.throttle, dtype=bool) & (self.fuel > 0)
+        self.vx = np.where(accelerating & on_ground, self.vx + 0.3, self.vx)
+        self.fuel = np.where(accelerating, self.fuel - self.fuel_consumption, self.fuel)
+        braking = alive & np.asarray(controls.brake, dtype=bool) & on_ground
+        self.vx = np.where(braking, self.vx - 0.2, self.vx)
+        jumping = alive & np.asarray(controls.jump, dtype=bool) & on_ground & self.can_jump
+        jump_boost = np.minimum(np.abs(self.vx) * 0.5, 5)
+        self.vy = np.where(jumping, -(self.jump_force + jump_boost), self.vy)
+        self.can_jump = self.can_jump & ~jumping
+        airborne = alive & ~on_ground
+        self.angular_velocity = self.angular_velocity \
+            - np.where(airborne & np.asarray(controls.tilt_back, dtype=bool), 0.005, 0) \
+            + np.where(airborne & np.asarray(controls.tilt_forward, dtype=bool), 0.005, 0)
+
+        # Physics
+        vy = self.vy + self.gravity
+        vx = self.vx * 0.99
+        x = self.x + vx
+        y = self.y + vy
+        angle = self.angle + self.angular_velocity
+        angular_velocity = self.angular_velocity * 0.95
+
+        # Wheel positions
+        half_base = self.wheel_base / 2
+        cos_a = np.cos(angle)
+        sin_a = np.sin(angle)
+        front_x = x + cos_a * half_base
+        front_y = y + sin_a * half_base
+        rear_x = x - cos_a * half_base
+        rear_y = y - sin_a * half_base
+
+        # Ground collision, one bulk terrain lookup for both wheels of every car
+        self.terrain.cover(min(rear_x.min(), front_x.min()) - 500, max(rear_x.max(), front_x.max()) + 500)
+        grounds = self.terrain.get_ground_y_many(np.concatenate((front_x, rear_x)))
+        front_ground = grounds[:self.count]
+        rear_ground = grounds[self.count:]
+
+        r = self.wheel_radius
+        front_hit = front_y + r > front_ground
+        rear_hit = rear_y + r > rear_ground
+        front_y = np.where(front_hit, front_ground - r, front_y)
+        rear_y = np.where(rear_hit, rear_ground - r, rear_y)
+        grounded = front_hit | rear_hit
+        crashed = grounded & (vy > self.max_landing_speed)
+
+        suspension_front = (front_ground - front_y - r) * 0.3
+        suspension_rear = (rear_ground - rear_y - r) * 0.3
+        suspension_front = np.where(grounded, suspension_front, self.suspension_front * 0.8)
+        suspension_rear = np.where(grounded, suspension_rear, self.suspension_rear * 0.8)
+        x = np.where(grounded, (front_x + rear_x) / 2, x)
+        y = np.where(grounded, (front_y + rear_y) / 2 - (suspension_front + suspension_rear) / 2, y)
+        angle = np.where(grounded, np.arctan2(front_y - rear_y, front_x - rear_x), angle)
+        vy = np.where(grounded, vy * -0.3, vy)
+        angular_velocity = np.where(grounded, angular_velocity * 0.5, angular_velocity)
+        can_jump = self.can_jump | grounded
+
+        # Tilt crash
+        angle_deg = np.abs(np.degrees(angle) % 360)
+        angle_deg = np.where(angle_deg > 180, 360 - angle_deg, angle_deg)
+        crashed |= grounded & (angle_deg > self.max_tilt_angle)
+
+        # Wheel rotation
+        wheel_angle = np.where(grounded, self.wheel_angle + vx * 0.1, self.wheel_angle)
+
+        # Crashed cars are frozen, exactly as Car.update returns early
+        self.x = np.where(alive, x, self.x)
+        self.y = np.where(alive, y, self.y)
+        self.vx = np.where(alive, vx, self.vx)
+        self.vy = np.where(alive, vy, self.vy)
+        self.angle = np.where(alive, angle, self.angle)
+        self.angular_velocity = np.where(alive, angular_velocity, self.angular_velocity)
+        self.wheel_angle = np.where(alive, wheel_angle, self.wheel_angle)
+        self.suspension_front = np.where(alive, suspension_front, self.suspension_front)
+        self.suspension_rear = np.where(alive, suspension_rear, self.suspension_rear)
+        self.on_ground = np.where(alive, grounded, self.on_ground)
+        self.can_jump = np.where(alive, can_jump, self.can_jump)
+        self.crashed = self.crashed | (alive & crashed)
+        self.steps += 1
+        return accelerating
+
+class BatchBotController:
+    # Vectorized BotController: holds a cruising speed and levels out in the air
+    def __init__(self, max_speed=4, tilt_tolerance=0.1):
+        self.max_speed = max_speed
+        self.tilt_tolerance = tilt_tolerance
+
+    def get_controls(self, cars):
+        airborne = ~cars.on_ground
+        return Controls(
+            throttle=cars.vx < self.max_speed,
+            tilt_back=airborne & (cars.angle > self.tilt_tolerance),
+            tilt_forward=airborne & (cars.angle < -self.tilt_tolerance),
+        )
+
+def benchmark(count, steps):
+    cars = BatchCars(count)
+    bot = BatchBotController()
+    start = time.perf_counter()
+    for _ in range(steps):
+        cars.step(bot.get_controls(cars))
+    elapsed = time.perf_counter() - start
+    print(f"{count} cars x {steps} steps in {elapsed:.3f}s "
+          f"({count * steps / max(elapsed, 1e-9) / 1e6:.2f}M car-steps/s)")
+    print(f"Crashed: {int(cars.crashed.sum())}  Mean x: {cars.x.mean():.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched car physics benchmark")
+    parser.add_argument("--cars", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=600)
+    args = parser.parse_args()
+    benchmark(args.cars, args.steps)
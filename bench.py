@@ -0,0 +1,202 @@
+import os
+
+# Must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import time
+import numpy as np
+import pygame
+
+from game import (
+    BotController, Controls, Game, ParticleSystem, ScriptedController, Terrain, PHYSICS_HZ,
+)
+
+# Reproducible frame-time benchmarks for the game under the SDL dummy video
+# driver. Each scenario drives a real Game with a fixed seed and a scripted
+# controller, without clock.tick, and records per-frame and per-phase times.
+
+class Scenario:
+    def __init__(self, name, frames, controller, warmup_frames=0, restart_after=60):
+        self.name = name
+        self.frames = frames
+        self.controller = controller
+        # Frames simulated (update only, not drawn or timed) before measuring
+        self.warmup_frames = warmup_frames
+        # Frames to stay on the game over screen before "pressing R"
+        self.restart_after = restart_after
+
+SCENARIOS = [
+    Scenario("idle_start", 600, lambda: ScriptedController([Controls()])),
+    Scenario("high_speed_run", 1800, lambda: BotController(max_speed=8)),
+    Scenario("particle_crash", 1800, lambda: ScriptedController([Controls(throttle=True)])),
+    Scenario("hour_session", 600, lambda: BotController(), warmup_frames=PHYSICS_HZ * 3600),
+]
+
+# (label, owner, attribute) of every timed phase. Phases nest: "update"
+# includes particles.update, and "draw" includes all of the draw phases.
+PHASES = [
+    ("update", Game, "update"),
+    ("draw", Game, "draw"),
+    ("draw_gradient_sky", Game, "draw_gradient_sky"),
+    ("draw_mountains", Game, "draw_mountains"),
+    ("terrain.draw", Terrain, "draw"),
+    ("particles.update", ParticleSystem, "update"),
+    ("particles.draw", ParticleSystem, "draw"),
+    ("draw_hud", Game, "draw_hud"),
+]
+
+class PhaseTimers:
+    # Wraps the PHASES methods on their classes for the duration of a run
+    def __init__(self):
+        self.totals = {label: 0.0 for label, _, _ in PHASES}
+        self.samples = {label: [] for label, _, _ in PHASES}
+        self.originals = []
+
+    def wrap(self, label, method):
+        totals = self.totals
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                totals[label] += time.perf_counter() - start
+        return timed
+
+    def __enter__(self):
+        for label, owner, name in PHASES:
+            method = getattr(owner, name)
+            self.originals.append((owner, name, method))
+            setattr(owner, name, self.wrap(label, method))
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, method in self.originals:
+            setattr(owner, name, method)
+        self.originals = []
+
+    def end_frame(self):
+        for label, total in self.totals.items():
+            self.samples[label].append(total)
+            self.totals[label] = 0.0
+
+def summarize(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        "mean": float(ms.mean()),
+        "p50": float(np.percentile(ms, 50)),
+        "p99": float(np.percentile(ms, 99)),
+        "max": float(ms.max()),
+    }
+
+def run_scenario(game, scenario, seed):
+    game.sim.controller = scenario.controller()
+    game.sim.reseed(seed)
+    game.reset()
+
+    game_over_frames = 0
+    restarts = 0
+
+    def advance():
+        nonlocal game_over_frames, restarts
+        if game.game_over:
+            game_over_frames += 1
+            if game_over_frames > scenario.restart_after:
+                game_over_frames = 0
+                restarts += 1
+                game.reset()
+
+    warmup_start = time.perf_counter()
+    for _ in range(scenario.warmup_frames):
+        game.update()
+        advance()
+    warmup = time.perf_counter() - warmup_start
+
+    frame_times = []
+    with PhaseTimers() as timers:
+        for _ in range(scenario.frames):
+            start = time.perf_counter()
+            game.update()
+            game.draw()
+            game.present()
+            frame_times.append(time.perf_counter() - start)
+            timers.end_frame()
+            advance()
+
+    total = sum(frame_times)
+    return {
+        "frames": scenario.frames,
+        "fps": scenario.frames / total if total else 0.0,
+        "frame_ms": summarize(frame_times),
+        "phases_ms": {label: summarize(samples) for label, samples in timers.samples.items()},
+        "warmup_frames": scenario.warmup_frames,
+        "warmup_s": warmup,
+        "restarts": restarts,
+        "entities": {
+            "coins": len(game.sim.coins),
+            "islands": len(game.sim.islands),
+            "obstacles": len(game.sim.obstacles),
+            "particles": len(game.particles),
+            "terrain_points": len(game.terrain),
+        },
+    }
+
+def print_report(results, baseline=None):
+    for name, result in results["scenarios"].items():
+        frame = result["frame_ms"]
+        line = f"{name:<16} {result['fps']:8.1f} fps  p50 {frame['p50']:6.2f} ms  p99 {frame['p99']:6.2f} ms"
+        if baseline and name in baseline.get("scenarios", {}):
+            before = baseline["scenarios"][name]["fps"]
+            line += f"  ({(result['fps'] - before) / before * 100:+.1f}% fps vs baseline)"
+        print(line)
+        for label, phase in result["phases_ms"].items():
+            print(f"    {label:<20} mean {phase['mean']:6.2f} ms  p99 {phase['p99']:6.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmarks")
+    parser.add_argument("--scenarios", default=",".join(s.name for s in SCENARIOS),
+                        help="comma separated scenario names")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="bench.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    names = args.scenarios.split(",")
+    unknown = set(names) - {s.name for s in SCENARIOS}
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    game = Game()
+    results = {
+        "meta": {
+            "seed": args.seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "scenarios": {},
+    }
+    for scenario in SCENARIOS:
+        if scenario.name in names:
+            results["scenarios"][scenario.name] = run_scenario(game, scenario, args.seed)
+    pygame.quit()
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import os
+
+# The environments never open a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import math
+import multiprocessing
+import time
+import numpy as np
+
+from game import Simulation, INPUT_BITS, TERRAIN_SEGMENT_WIDTH, mask_to_controls
+
+# Reinforcement-learning style environments over Simulation, following the
+# Gymnasium API (reset() -> (obs, info), step(action) -> (obs, reward,
+# terminated, truncated, info)) without depending on it.
+#
+# An action is an input bitmask over INPUT_BITS (throttle, brake, jump,
+# tilt_back, tilt_forward), the same encoding the input logs use, so there
+# are 2 ** len(INPUT_BITS) discrete actions.
+
+ACTION_COUNT = 1 << len(INPUT_BITS)
+ACTION_CONTROLS = [mask_to_controls(mask) for mask in range(ACTION_COUNT)]
+
+class HillClimbEnv:
+    # Terrain vertices in the observation, every LOOKAHEAD_STRIDE-th segment
+    # from the one under the car
+    LOOKAHEAD = 16
+    LOOKAHEAD_STRIDE = 2
+    # Observation: vx, vy, sin/cos of the body angle, angular velocity, fuel,
+    # on_ground, can_jump, then ground heights ahead relative to the car
+    CAR_FEATURES = 8
+    OBSERVATION_SIZE = CAR_FEATURES + LOOKAHEAD
+
+    # Reward per metre travelled, per coin, per unit of fuel gained (spending
+    # fuel costs the same), and once for crashing
+    DISTANCE_REWARD = 1.0
+    COIN_REWARD = 10.0
+    FUEL_REWARD = 0.1
+    CRASH_PENALTY = 50.0
+
+    def __init__(self, seed=None, physics=None, generator=None, max_steps=60 * 60 * 5):
+        self.max_steps = max_steps
+        self.sim = Simulation(seed=seed, physics=physics, generator=generator)
+        self.offsets = np.arange(self.LOOKAHEAD) * self.LOOKAHEAD_STRIDE
+        self.steps = 0
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.sim.reseed(seed)
+        self.sim.reset()
+        self.steps = 0
+        return self.observation(), self.info()
+
+    def step(self, action):
+        sim = self.sim
+        car = sim.car
+        x, coins, fuel = car.x, sim.coin_count, car.fuel
+        sim.step(ACTION_CONTROLS[int(action)])
+        self.steps += 1
+
+        reward = ((car.x - x) / 10 * self.DISTANCE_REWARD
+                  + (sim.coin_count - coins) * self.COIN_REWARD
+                  + (car.fuel - fuel) * self.FUEL_REWARD)
+        if car.crashed:
+            reward -= self.CRASH_PENALTY
+        terminated = sim.game_over
+        truncated = not terminated and self.steps >= self.max_steps
+        return self.observation(), reward, terminated, truncated, self.info()
+
+    def observation(self):
+        car = self.sim.car
+        obs = np.empty(self.OBSERVATION_SIZE, dtype=np.float32)
+        obs[:self.CAR_FEATURES] = (
+            car.vx, car.vy, math.sin(car.angle), math.cos(car.angle), car.angular_velocity,
+            car.fuel / 100, car.on_ground, car.can_jump,
+        )
+        # Read straight from the height ring buffer: Simulation.step keeps it
+        # covering well past the screen edge, far beyond the lookahead
+        terrain = self.sim.terrain
+        segments = np.clip(math.floor(car.x / TERRAIN_SEGMENT_WIDTH) + self.offsets, terrain.start, terrain.end - 1)
+        obs[self.CAR_FEATURES:] = (terrain.heights[segments & terrain.mask] - car.y) / 100
+        return obs
+
+    def info(self):
+        sim = self.sim
+        return {"distance": sim.distance, "coins": sim.coin_count, "fuel": sim.car.fuel,
+                "crash_cause": sim.car.crash_cause}
+
+class VectorEnv:
+    # Steps several HillClimbEnvs in this process. Finished environments are
+    # reset straight away; their last observation and info are returned
+    # under "final_observation" / "final_info" in that env's info.
+    def __init__(self, count, seed=None, **kwargs):
+        self.envs = [HillClimbEnv(seed=None if seed is None else seed + i, **kwargs)
+                     for i in range(count)]
+
+    def __len__(self):
+        return len(self.envs)
+
+    def reset(self):
+        results = [env.reset() for env in self.envs]
+        return np.stack([obs for obs, _ in results]), [info for _, info in results]
+
+    def step(self, actions):
+        count = len(self.envs)
+        obs = np.empty((count, HillClimbEnv.OBSERVATION_SIZE), dtype=np.float32)
+        rewards = np.empty(count)
+        terminated = np.empty(count, dtype=bool)
+        truncated = np.empty(count, dtype=bool)
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            obs[i], rewards[i], terminated[i], truncated[i], info = env.step(action)
+            if terminated[i] or truncated[i]:
+                info = dict(info, final_observation=obs[i].copy(), final_info=info)
+                obs[i], _ = env.reset()
+            infos.append(info)
+        return obs, rewards, terminated, truncated, infos
+
+    def close(self):
+        pass
+
+def worker(conn, count, seed, kwargs):
+    envs = VectorEnv(count, seed, **kwargs)
+    while True:
+        command, data = conn.recv()
+        if command == "step":
+            conn.send(envs.step(data))
+        elif command == "reset":
+            conn.send(envs.reset())
+        elif command == "close":
+            conn.close()
+            return
+
+class SubprocVectorEnv:
+    # Splits count environments across worker processes, each stepping its
+    # share as a VectorEnv, so one round trip per worker covers many envs.
+    # Same interface as VectorEnv.
+    def __init__(self, count, workers=None, seed=None, **kwargs):
+        workers = min(workers or os.cpu_count(), count)
+        sizes = [count // workers + (i < count % workers) for i in range(workers)]
+        self.bounds = np.cumsum([0] + sizes)
+        self.count = count
+        self.conns = []
+        self.processes = []
+        for i, size in enumerate(sizes):
+            parent, child = multiprocessing.Pipe()
+            worker_seed = None if seed is None else seed + int(self.bounds[i])
+            process = multiprocessing.Process(target=worker, args=(child, size, worker_seed, kwargs), daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def __len__(self):
+        return self.count
+
+    def reset(self):
+        for conn in self.conns:
+            conn.send(("reset", None))
+        results = [conn.recv() for conn in self.conns]
+        return np.concatenate([obs for obs, _ in results]), [info for _, infos in results for info in infos]
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        for conn, lo, hi in zip(self.conns, self.bounds[:-1], self.bounds[1:]):
+            conn.send(("step", actions[lo:hi]))
+        results = [conn.recv() for conn in self.conns]
+        return (
+            np.concatenate([r[0] for r in results]),
+            np.concatenate([r[1] for r in results]),
+            np.concatenate([r[2] for r in results]),
+            np.concatenate([r[3] for r in results]),
+            [info for r in results for info in r[4]],
+        )
+
+    def close(self):
+        for conn in self.conns:
+            conn.send(("close", None))
+        for process in self.processes:
+            process.join()
+
+def benchmark(count, steps, workers, seed):
+    envs = SubprocVectorEnv(count, workers, seed=seed) if workers else VectorEnv(count, seed=seed)
+    rng = np.random.default_rng(seed)
+    # Mostly throttle so episodes last, with random other inputs
+    throttle = 1 << INPUT_BITS.index("throttle")
+    envs.reset()
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        actions = rng.integers(0, ACTION_COUNT, count) | throttle
+        _, _, terminated, truncated, _ = envs.step(actions)
+        episodes += int(terminated.sum() + truncated.sum())
+    elapsed = time.perf_counter() - start
+    envs.close()
+    mode = f"{workers} worker processes" if workers else "in-process"
+    print(f"{count} envs x {steps} steps ({mode}) in {elapsed:.2f}s: "
+          f"{count * steps / max(elapsed, 1e-9):.0f} steps/s, {episodes} episodes finished")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Environment throughput benchmark (no display)")
+    parser.add_argument("--envs", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 steps in-process)")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+    benchmark(args.envs, args.steps, args.workers, args.seed)
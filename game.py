@@ -1,17 +1,62 @@
-import pygame
+import time
+# Taken before anything else is imported, for --startup-profile
+IMPORT_START = time.perf_counter()
+
+import argparse
+import glob
+import hashlib
+import json
 import math
+import os
 import random
+import struct
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+import importlib
+import numpy as np
+
+# Stands in for a module until something first reads from it, then imports it
+# and puts it in its place in this module. Everything pygame does here is
+# drawing, input or the window, so Simulation and the tools built on it
+# (batch, sweep, env) run without ever loading pygame, or having it installed.
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._name] = module
+        return getattr(module, attr)
+
+pygame = LazyModule("pygame")
 
 # Constants
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 700
 FPS = 60
+FRAME_BUDGET_MS = 1000 / FPS
+PHYSICS_HZ = 60
+PHYSICS_DT = 1 / PHYSICS_HZ
+MAX_PHYSICS_STEPS_PER_FRAME = 5
 GRAVITY = 0.5
 MAX_TILT_ANGLE = 75
 MAX_LANDING_SPEED = 15
 FUEL_CONSUMPTION = 0.05
 JUMP_FORCE = 12
 TERRAIN_SEGMENT_WIDTH = 20
+TERRAIN_FIRST_SEGMENT = -50
+TERRAIN_CHUNK_SIZE = 64
+TERRAIN_PREFETCH_CHUNKS = 2
+ENTITY_CELL_WIDTH = 256
+BODY_ANGLE_STEPS = 180
+WHEEL_PHASE_STEPS = 16
+HUD_PANEL_WIDTH = 320
+HUD_PANEL_HEIGHT = 250
+ENTITY_VIEW_MARGIN = 50
+ENTITY_EVICT_DISTANCE = 500
 
 # Colors
 SKY_TOP = (135, 206, 250)
@@ -21,131 +66,683 @@ SOIL_COLOR = (139, 90, 43)
 COIN_COLOR = (255, 215, 0)
 UI_BG = (0, 0, 0, 128)
 
-class Particle:
-    def __init__(self, x, y, vx, vy, color, lifetime, size=4):
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
-        self.color = color
-        self.lifetime = lifetime
-        self.max_lifetime = lifetime
-        self.size = size
-        
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.2
-        self.lifetime -= 1
-        return self.lifetime > 0
+CAR_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "eyevine01306955-2-removebg-preview.png")
+CAR_IMAGE_SIZE = (80, 80)
 
+# Struct-of-arrays particle pool. Live particles are packed at the front of
+# preallocated arrays; expired slots are compacted away and reused by later
+# emissions, and anything beyond the capacity is simply not emitted.
 class ParticleSystem:
-    def __init__(self):
-        self.particles = []
+    def __init__(self, capacity=2048, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)
+        self.max_lifetime = np.ones(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.int32)
+        self.palette = []
+        self.palette_index = {}
+
+    def __len__(self):
+        return self.count
+
+    def color_id(self, color):
+        if color not in self.palette_index:
+            self.palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        return self.palette_index[color]
         
     def emit(self, x, y, count, color_range, speed_range, size=4):
-        for _ in range(count):
-            angle = random.uniform(0, math.pi * 2)
-            speed = random.uniform(*speed_range)
-            vx = math.cos(angle) * speed
-            vy = math.sin(angle) * speed
-            color = random.choice(color_range)
-            lifetime = random.randint(20, 40)
-            self.particles.append(Particle(x, y, vx, vy, color, lifetime, size))
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        start, end = self.count, self.count + count
+        angle = self.rng.uniform(0, math.pi * 2, count)
+        speed = self.rng.uniform(speed_range[0], speed_range[1], count)
+        colors = np.array([self.color_id(c) for c in color_range], dtype=np.int32)
+        self.x[start:end] = self.prev_x[start:end] = x
+        self.y[start:end] = self.prev_y[start:end] = y
+        self.vx[start:end] = np.cos(angle) * speed
+        self.vy[start:end] = np.sin(angle) * speed
+        self.lifetime[start:end] = self.rng.integers(20, 41, count)
+        self.max_lifetime[start:end] = self.lifetime[start:end]
+        self.size[start:end] = size
+        self.color[start:end] = colors[self.rng.integers(0, len(colors), count)]
+        self.count = end
             
     def update(self):
-        self.particles = [p for p in self.particles if p.update()]
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += 0.2
+        self.lifetime[:n] -= 1
+
+        alive = self.lifetime[:n] > 0
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            for field in (self.x, self.y, self.prev_x, self.prev_y, self.vx, self.vy, self.lifetime,
+                          self.max_lifetime, self.size, self.color):
+                field[:len(keep)] = field[keep]
+            self.count = len(keep)
+
+    def clear(self):
+        self.count = 0
+
+    def reset(self, seed=None):
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+
+    FIELDS = ("x", "y", "prev_x", "prev_y", "vx", "vy", "lifetime", "max_lifetime", "size", "color")
+
+    # count, palette size, then the PCG64 state: 128-bit state and increment
+    # as two 64-bit halves each, plus the buffered 32-bit output
+    HEADER = struct.Struct("<II4QBI")
+
+    def snapshot(self):
+        n = self.count
+        rng = self.rng.bit_generator.state
+        state, inc = rng["state"]["state"], rng["state"]["inc"]
+        parts = [self.HEADER.pack(n, len(self.palette), state >> 64, state & (2 ** 64 - 1),
+                                  inc >> 64, inc & (2 ** 64 - 1), rng["has_uint32"], rng["uinteger"]),
+                 bytes(channel for color in self.palette for channel in color)]
+        parts.extend(getattr(self, name)[:n].tobytes() for name in self.FIELDS)
+        return b"".join(parts)
+
+    def restore(self, data, offset):
+        n, colors, state_hi, state_lo, inc_hi, inc_lo, has_uint32, uinteger = self.HEADER.unpack_from(data, offset)
+        offset += self.HEADER.size
+        self.rng.bit_generator.state = {
+            "bit_generator": "PCG64",
+            "state": {"state": state_hi << 64 | state_lo, "inc": inc_hi << 64 | inc_lo},
+            "has_uint32": has_uint32,
+            "uinteger": uinteger,
+        }
+        channels = data[offset:offset + colors * 3]
+        self.palette = [tuple(channels[i:i + 3]) for i in range(0, colors * 3, 3)]
+        self.palette_index = {color: i for i, color in enumerate(self.palette)}
+        offset += colors * 3
+        self.count = n
+        for name in self.FIELDS:
+            field = getattr(self, name)
+            field[:n] = np.frombuffer(data, field.dtype, n, offset)
+            offset += n * field.itemsize
+        return offset
+
+    def frozen(self):
+        # A drawing-only copy of the live particles, for another thread
+        n = self.count
+        particles = ParticleSystem.__new__(ParticleSystem)
+        particles.capacity = particles.count = n
+        for name in ("x", "y", "prev_x", "prev_y", "lifetime", "max_lifetime", "size", "color"):
+            setattr(particles, name, getattr(self, name)[:n].copy())
+        particles.palette = list(self.palette)
+        return particles
+
+    def sprite(self, color, radius):
+        return sprite_cache.get(("particle", color, radius), lambda: self.render_sprite(color, radius))
+
+    def render_sprite(self, color, radius):
+        surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, color, (radius, radius), radius)
+        return surface
         
-    def draw(self, screen, camera):
-        for p in self.particles:
-            alpha = int(255 * (p.lifetime / p.max_lifetime))
-            size = max(1, int(p.size * (p.lifetime / p.max_lifetime)))
-            screen_x, screen_y = camera.world_to_screen(p.x, p.y)
-            if 0 <= screen_x < SCREEN_WIDTH and 0 <= screen_y < SCREEN_HEIGHT:
-                pygame.draw.circle(screen, p.color, (int(screen_x), int(screen_y)), size)
+    def screen_positions(self, camera, alpha):
+        # (indices, left, top, radius) of the particles on screen this frame
+        n = self.count
+        xs = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha
+        ys = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha
+        screen_x, screen_y, visible = camera.project(xs, ys, 0, 0)
+        idx = np.flatnonzero(visible)
+        sizes = np.maximum(1, (self.size[idx] * self.lifetime[idx]) // self.max_lifetime[idx])
+        return idx, screen_x[idx].astype(np.int32) - sizes, screen_y[idx].astype(np.int32) - sizes, sizes
+
+    def bounds(self, camera, alpha=1.0):
+        # Screen rect covering every particle drawn this frame, or None
+        if self.count == 0:
+            return None
+        idx, xs, ys, sizes = self.screen_positions(camera, alpha)
+        if len(idx) == 0:
+            return None
+        left, top = int(xs.min()), int(ys.min())
+        return pygame.Rect(left, top, int((xs + sizes * 2).max()) - left, int((ys + sizes * 2).max()) - top)
+
+    def draw(self, screen, camera, alpha=1.0):
+        if self.count == 0:
+            return
+        idx, xs, ys, sizes = self.screen_positions(camera, alpha)
+        if len(idx) == 0:
+            return
+        palette = self.palette
+        screen.blits([(self.sprite(palette[c], r), (sx, sy))
+                      for c, r, sx, sy in zip(self.color[idx].tolist(), sizes.tolist(), xs.tolist(), ys.tolist())],
+                     doreturn=False)
 
 class Camera:
-    def __init__(self):
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.reset(seed)
+        
+    def reset(self, seed=None):
+        self.rng.seed(seed)
         self.x = 0
         self.y = 0
+        # Position before the last physics step, and the interpolated
+        # position between the two that the current frame is drawn from
+        self.prev_x = self.render_x = 0
+        self.prev_y = self.render_y = 0
         self.shake_amount = 0
         self.shake_duration = 0
+        self.shake_x = 0
+        self.shake_y = 0
         
     def update(self, target_x, target_y):
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.x += (target_x - self.x - 200) * 0.1
         self.y += (target_y - self.y - SCREEN_HEIGHT // 2) * 0.1
         
         if self.shake_duration > 0:
             self.shake_duration -= 1
             
+    def begin_frame(self, alpha=1.0):
+        # Whole pixels, so every layer moves together and a view that hasn't
+        # moved by a pixel draws exactly the same frame
+        self.render_x = round(self.prev_x + (self.x - self.prev_x) * alpha)
+        self.render_y = round(self.prev_y + (self.y - self.prev_y) * alpha)
+        
+        # One shake offset per rendered frame, shared by everything drawn in it
+        if self.shake_duration > 0:
+            self.shake_x = round(self.rng.uniform(-self.shake_amount, self.shake_amount))
+            self.shake_y = round(self.rng.uniform(-self.shake_amount, self.shake_amount))
+        else:
+            self.shake_x = self.shake_y = 0
+            
+    STATE = struct.Struct("<5dq")
+
+    def snapshot(self):
+        return self.STATE.pack(self.x, self.y, self.prev_x, self.prev_y,
+                               self.shake_amount, self.shake_duration) + pack_random(self.rng)
+
+    def restore(self, data, offset):
+        (self.x, self.y, self.prev_x, self.prev_y,
+         self.shake_amount, self.shake_duration) = self.STATE.unpack_from(data, offset)
+        return unpack_random(self.rng, data, offset + self.STATE.size)
+
+    def view(self):
+        # Screen position of the world origin this frame
+        return self.shake_x - self.render_x, self.shake_y - self.render_y
+            
     def world_to_screen(self, x, y):
-        shake_x = random.uniform(-self.shake_amount, self.shake_amount) if self.shake_duration > 0 else 0
-        shake_y = random.uniform(-self.shake_amount, self.shake_amount) if self.shake_duration > 0 else 0
-        return x - self.x + shake_x, y - self.y + shake_y
+        return x - self.render_x + self.shake_x, y - self.render_y + self.shake_y
+        
+    def project(self, xs, ys, x_margin=0, y_margin=None):
+        # Bulk world_to_screen for arrays of points. Also returns a mask of the
+        # points within x_margin of the screen horizontally (and y_margin
+        # vertically, if given).
+        sx = np.asarray(xs, dtype=np.float64) - (self.render_x - self.shake_x)
+        sy = np.asarray(ys, dtype=np.float64) - (self.render_y - self.shake_y)
+        visible = (sx >= -x_margin) & (sx <= SCREEN_WIDTH + x_margin)
+        if y_margin is not None:
+            visible &= (sy >= -y_margin) & (sy <= SCREEN_HEIGHT + y_margin)
+        return sx, sy, visible
         
     def shake(self, amount, duration):
         self.shake_amount = amount
         self.shake_duration = duration
 
+# Terrain heights are generated a chunk of TERRAIN_CHUNK_SIZE segments at a
+# time in one NumPy pass. Recent chunks are kept in a small LRU shared by every
+# Terrain in the process, and the chunks just ahead of a terrain window are
+# computed on a worker thread before they are needed.
+#
+# A seed shifts the phase of each wave to give a different course with the
+# same difficulty curve; seed None is the original course.
+class TerrainGenerator:
+    def __init__(self, chunk_size=TERRAIN_CHUNK_SIZE, max_chunks=64, prefetch=True, seed=None):
+        self.chunk_size = chunk_size
+        self.seed = seed
+        if seed is None:
+            self.phases = np.zeros(3)
+        else:
+            self.phases = np.random.default_rng(seed).uniform(0, 2 * math.pi, 3)
+        self.max_chunks = max_chunks
+        self.prefetch_enabled = prefetch
+        self.chunks = OrderedDict()
+        self.pending = {}
+        self.executor = None
+        self.pid = os.getpid()
+        # The LRU is shared with the renderer's thread in pipelined mode
+        self.lock = threading.Lock()
+
+    def heights_at(self, xs):
+        # Vectorized Terrain.get_height_at
+        xs = np.asarray(xs, dtype=np.float64)
+        scale = 1 + np.minimum(xs / 5000, 2)
+        wave1 = np.sin(xs * 0.01 + self.phases[0]) * 50 * scale
+        wave2 = np.sin(xs * 0.03 + self.phases[1]) * 25 * scale
+        wave3 = np.sin(xs * 0.005 + self.phases[2]) * 100 * scale
+        return 400 + wave1 + wave2 + wave3
+
+    def compute(self, index):
+        first = index * self.chunk_size
+        return self.heights_at(np.arange(first, first + self.chunk_size) * TERRAIN_SEGMENT_WIDTH)
+
+    def check_fork(self):
+        # Worker threads don't survive fork(), so a child starts without them
+        # (and with a fresh lock, in case one of them held it)
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.executor = None
+            self.pending = {}
+            self.lock = threading.Lock()
+
+    def segment_heights(self, lo, hi):
+        # Heights of segments [lo, hi), possibly spanning several chunks
+        parts = []
+        while lo < hi:
+            index = lo // self.chunk_size
+            offset = lo - index * self.chunk_size
+            n = min(self.chunk_size - offset, hi - lo)
+            parts.append(self.chunk(index)[offset:offset + n])
+            lo += n
+        return np.concatenate(parts)
+
+    def chunk(self, index):
+        self.check_fork()
+        with self.lock:
+            chunk = self.chunks.get(index)
+            if chunk is not None:
+                self.chunks.move_to_end(index)
+                return chunk
+            future = self.pending.pop(index, None)
+            chunk = future.result() if future is not None else self.compute(index)
+            self.chunks[index] = chunk
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+            return chunk
+
+    def prefetch(self, index):
+        if not self.prefetch_enabled or index in self.chunks:
+            return
+        self.check_fork()
+        with self.lock:
+            if index in self.pending or len(self.pending) >= self.max_chunks:
+                return
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="terrain")
+            self.pending[index] = self.executor.submit(self.compute, index)
+
+terrain_generator = TerrainGenerator()
+
+# Heights are stored in a power-of-two ring buffer addressed by segment index
+# (x // TERRAIN_SEGMENT_WIDTH), so lookups never scan the window and trimming
+# the front is just an index bump.
 class Terrain:
-    def __init__(self):
-        self.points = []
+    chunks_rendered = 0
+
+    def __init__(self, capacity=512, generator=None):
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.heights = np.empty(capacity, dtype=np.float64)
+        self.generator = generator or terrain_generator
+        # Chunk index -> (surface, world_x, world_top), rendered at surface_step
+        self.surfaces = {}
+        self.surface_step = 1
+        self.start = 0
+        self.end = 0
         self.generate_initial()
-        
+        # Kept for reset(), along with the surfaces of the chunks in view at
+        # the start (the camera begins at x=0 and settles 200px behind the car)
+        self.initial_heights = self.heights[np.arange(self.start, self.end) & self.mask].copy()
+        chunk_width = self.generator.chunk_size * TERRAIN_SEGMENT_WIDTH
+        self.start_chunks = range(math.floor(-200 / chunk_width), math.floor(SCREEN_WIDTH / chunk_width) + 1)
+
     def generate_initial(self):
-        for i in range(-50, 200):
-            x = i * TERRAIN_SEGMENT_WIDTH
-            y = self.get_height_at(x)
-            self.points.append((x, y))
-            
+        self.start = self.end = TERRAIN_FIRST_SEGMENT
+        self.extend(TERRAIN_FIRST_SEGMENT, 200)
+
+    def window(self):
+        # A copy of the height window for another thread to draw from
+        return self.start, self.end, self.heights.copy()
+
+    def follow(self, window):
+        # Show a window taken from another Terrain by window(), keeping this
+        # one's chunk surfaces
+        self.start, self.end, self.heights = window
+        self.capacity = len(self.heights)
+        self.mask = self.capacity - 1
+
+    WINDOW = struct.Struct("<qq")
+
+    def snapshot(self):
+        # The window bounds and its heights; chunks are regenerated on demand
+        return (self.WINDOW.pack(self.start, self.end)
+                + self.heights[np.arange(self.start, self.end) & self.mask].tobytes())
+
+    def restore(self, data, offset):
+        self.start, self.end = self.WINDOW.unpack_from(data, offset)
+        offset += self.WINDOW.size
+        n = self.end - self.start
+        while n > self.capacity:
+            self.grow()
+        self.heights[np.arange(self.start, self.end) & self.mask] = np.frombuffer(data, np.float64, n, offset)
+        return offset + n * 8
+
+    def reset(self):
+        # Back to the starting window without regenerating it
+        self.start = TERRAIN_FIRST_SEGMENT
+        self.end = TERRAIN_FIRST_SEGMENT + len(self.initial_heights)
+        self.heights[np.arange(self.start, self.end) & self.mask] = self.initial_heights
+
     def get_height_at(self, x):
         base = 400
         difficulty = min(x / 5000, 2)
-        wave1 = math.sin(x * 0.01) * 50 * (1 + difficulty)
-        wave2 = math.sin(x * 0.03) * 25 * (1 + difficulty)
-        wave3 = math.sin(x * 0.005) * 100 * (1 + difficulty)
+        phase1, phase2, phase3 = self.generator.phases.tolist()
+        wave1 = math.sin(x * 0.01 + phase1) * 50 * (1 + difficulty)
+        wave2 = math.sin(x * 0.03 + phase2) * 25 * (1 + difficulty)
+        wave3 = math.sin(x * 0.005 + phase3) * 100 * (1 + difficulty)
         return base + wave1 + wave2 + wave3
-        
+
+    def __len__(self):
+        return self.end - self.start
+
+    def grow(self):
+        indices = np.arange(self.start, self.end)
+        heights = np.empty(self.capacity * 2, dtype=np.float64)
+        heights[indices & (self.capacity * 2 - 1)] = self.heights[indices & self.mask]
+        self.heights = heights
+        self.capacity *= 2
+        self.mask = self.capacity - 1
+
+    def extend(self, start, end):
+        # Widen the window to [start, end) segments, copying from chunks
+        start = min(start, self.start)
+        end = max(end, self.end)
+        while end - start > self.capacity:
+            self.grow()
+        for lo, hi in ((start, self.start), (self.end, end)):
+            if lo < hi:
+                self.heights[np.arange(lo, hi) & self.mask] = self.generator.segment_heights(lo, hi)
+        self.start = start
+        self.end = end
+
     def update(self, camera_x):
-        while self.points[-1][0] < camera_x + SCREEN_WIDTH + 500:
-            last_x = self.points[-1][0]
-            new_x = last_x + TERRAIN_SEGMENT_WIDTH
-            new_y = self.get_height_at(new_x)
-            self.points.append((new_x, new_y))
-            
-        while self.points[0][0] < camera_x - 500:
-            self.points.pop(0)
-            
+        self.cover(camera_x - 500, camera_x + SCREEN_WIDTH + 500)
+
+    def cover(self, x_min, x_max):
+        # Keep every segment from x_min to x_max: extend ahead until the last
+        # point reaches x_max and drop points before x_min, always keeping the
+        # last point. Going backwards re-extends from the recent chunks, back
+        # to where the terrain started.
+        end = max(self.end, math.ceil(x_max / TERRAIN_SEGMENT_WIDTH) + 1)
+        start = min(math.ceil(x_min / TERRAIN_SEGMENT_WIDTH), end - 1)
+        if start < self.start:
+            start = min(self.start, max(start, TERRAIN_FIRST_SEGMENT))
+        self.extend(min(start, self.start), end)
+        self.start = start
+
+        chunk_size = self.generator.chunk_size
+        for ahead in range(1, TERRAIN_PREFETCH_CHUNKS + 1):
+            self.generator.prefetch(self.end // chunk_size + ahead)
+
+    def segment_index(self, x):
+        i = math.floor(x / TERRAIN_SEGMENT_WIDTH)
+        if i == self.end - 1 and x == i * TERRAIN_SEGMENT_WIDTH:
+            i -= 1
+        if self.start <= i < self.end - 1:
+            return i
+        return None
+
     def get_ground_y(self, x):
-        for i in range(len(self.points) - 1):
-            x1, y1 = self.points[i]
-            x2, y2 = self.points[i + 1]
-            if x1 <= x <= x2:
-                t = (x - x1) / (x2 - x1)
-                return y1 + (y2 - y1) * t
-        return 400
-        
+        i = self.segment_index(x)
+        if i is None:
+            return 400
+        y1 = self.heights[i & self.mask]
+        y2 = self.heights[(i + 1) & self.mask]
+        t = (x - i * TERRAIN_SEGMENT_WIDTH) / TERRAIN_SEGMENT_WIDTH
+        return float(y1 + (y2 - y1) * t)
+
+    def get_ground_y_many(self, xs):
+        xs = np.asarray(xs, dtype=np.float64)
+        i = np.floor(xs / TERRAIN_SEGMENT_WIDTH).astype(np.int64)
+        i = np.where((i == self.end - 1) & (xs == i * TERRAIN_SEGMENT_WIDTH), i - 1, i)
+        valid = (i >= self.start) & (i < self.end - 1)
+        i = np.where(valid, i, self.start)
+        y1 = self.heights[i & self.mask]
+        y2 = self.heights[(i + 1) & self.mask]
+        t = (xs - i * TERRAIN_SEGMENT_WIDTH) / TERRAIN_SEGMENT_WIDTH
+        return np.where(valid, y1 + (y2 - y1) * t, 400.0)
+
+    def highest_point(self, x_min, x_max):
+        # Smallest ground y over [x_min, x_max] (within the current window)
+        lo = max(math.floor(x_min / TERRAIN_SEGMENT_WIDTH), self.start)
+        hi = min(math.ceil(x_max / TERRAIN_SEGMENT_WIDTH) + 1, self.end)
+        if lo >= hi:
+            return 0
+        return float(self.heights[np.arange(lo, hi) & self.mask].min())
+
     def get_slope_angle(self, x):
-        for i in range(len(self.points) - 1):
-            x1, y1 = self.points[i]
-            x2, y2 = self.points[i + 1]
-            if x1 <= x <= x2:
-                return math.atan2(y2 - y1, x2 - x1)
-        return 0
-        
-    def draw(self, screen, camera):
-        visible_points = []
-        for x, y in self.points:
-            sx, sy = camera.world_to_screen(x, y)
-            if -100 <= sx <= SCREEN_WIDTH + 100:
-                visible_points.append((sx, sy))
-                
-        if len(visible_points) > 1:
-            grass_points = visible_points + [(SCREEN_WIDTH + 100, SCREEN_HEIGHT + 100), (-100, SCREEN_HEIGHT + 100)]
-            pygame.draw.polygon(screen, SOIL_COLOR, grass_points)
-            pygame.draw.lines(screen, GRASS_COLOR, False, visible_points, 8)
+        i = self.segment_index(x)
+        if i is None:
+            return 0
+        y1 = self.heights[i & self.mask]
+        y2 = self.heights[(i + 1) & self.mask]
+        return math.atan2(y2 - y1, TERRAIN_SEGMENT_WIDTH)
+
+    def render_chunk(self, index, step=1):
+        # Rasterize one chunk (soil and grass edge) into a surface spanning
+        # its height band, using every step-th segment for the outline.
+        # Returns (surface, world_x, world_top).
+        chunk_size = self.generator.chunk_size
+        first = max(index * chunk_size, TERRAIN_FIRST_SEGMENT)
+        last = (index + 1) * chunk_size
+        # One neighbour on each side so the grass edge joins up across chunks
+        lo = max(first - 1, TERRAIN_FIRST_SEGMENT)
+        heights = self.generator.segment_heights(lo, last + 2)
+        x0 = first * TERRAIN_SEGMENT_WIDTH
+        top = math.floor(heights.min()) - 8
+        bottom = math.ceil(heights.max()) + 8
+        width = (last - first) * TERRAIN_SEGMENT_WIDTH
+        xs = np.arange(lo, last + 2) * TERRAIN_SEGMENT_WIDTH - x0
+        points = np.column_stack((xs, heights - top)).tolist()
+        own_points = points[first - lo:first - lo + last - first + 1]
+        if step > 1:
+            # Thin the chunk's own points, keeping both ends so neighbouring
+            # chunks still meet, and share them with the grass edge
+            start = first - lo
+            thinned = own_points[::step]
+            if thinned[-1] != own_points[-1]:
+                thinned.append(own_points[-1])
+            points = points[:start] + thinned + points[start + len(own_points):]
+            own_points = thinned
+
+        Terrain.chunks_rendered += 1
+        surface = pygame.Surface((width, bottom - top))
+        surface.fill((255, 0, 255))
+        surface.set_colorkey((255, 0, 255))
+        pygame.draw.polygon(surface, SOIL_COLOR, own_points + [(width, bottom - top), (0, bottom - top)])
+        pygame.draw.lines(surface, GRASS_COLOR, False, points, 8)
+        return surface, x0, top
+
+    def draw(self, screen, camera, step=1):
+        if step != self.surface_step:
+            self.surfaces.clear()
+            self.surface_step = step
+        chunk_width = self.generator.chunk_size * TERRAIN_SEGMENT_WIDTH
+        first = math.floor(camera.render_x / chunk_width)
+        last = math.floor((camera.render_x + SCREEN_WIDTH) / chunk_width)
+        first = max(first, math.floor(TERRAIN_FIRST_SEGMENT / self.generator.chunk_size))
+
+        for index in [index for index in self.surfaces
+                      if not first <= index <= last and index not in self.start_chunks]:
+            del self.surfaces[index]
+
+        for index in range(first, last + 1):
+            entry = self.surfaces.get(index)
+            if entry is None:
+                entry = self.surfaces[index] = self.render_chunk(index, step)
+            surface, x0, top = entry
+            sx, sy = camera.world_to_screen(x0, top)
+            sx, sy = math.floor(sx), math.floor(sy)
+            screen.blit(surface, (sx, sy))
+            # Everything below the rasterized band is plain soil
+            below = sy + surface.get_height()
+            if below < SCREEN_HEIGHT:
+                # Clip first: Surface.fill shifts rects with a negative x instead of clipping them
+                soil = pygame.Rect(sx, below, surface.get_width(), SCREEN_HEIGHT - below).clip(screen.get_rect())
+                screen.fill(SOIL_COLOR, soil)
+
+class SpriteCache:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.renders = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, render):
+        surface = self.entries.get(key)
+        if surface is None:
+            surface = self.entries[key] = render()
+            self.renders += 1
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+sprite_cache = SpriteCache()
+
+# Fonts, images and pre-rendered screens, loaded on first use and kept for the
+# whole process, so every Game in it shares them. preload() starts a load on a
+# background thread; asking for it later waits for just that load. Fonts are
+# only ever loaded on the main thread, as SDL_ttf isn't thread safe.
+class Assets:
+    def __init__(self):
+        self.cache = {}
+        self.pending = {}
+        self.executor = None
+        # (key, seconds, loaded in the background) per load, for --startup-profile
+        self.load_times = []
+
+    # Keys are tuples whose first item is the kind of asset
+    def get(self, key, load):
+        if key not in self.cache:
+            future = self.pending.pop(key, None)
+            self.cache[key] = future.result() if future is not None else self.timed(key, load)
+        return self.cache[key]
+
+    def preload(self, key, load):
+        if key in self.cache or key in self.pending:
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+        self.pending[key] = self.executor.submit(self.timed, key, load, True)
+
+    def timed(self, key, load, background=False):
+        start = time.perf_counter()
+        asset = load()
+        self.load_times.append((key, time.perf_counter() - start, background))
+        return asset
+
+    def font(self, size):
+        if not pygame.font.get_init():
+            # Also after pygame.quit(), which closes every font loaded so far
+            pygame.font.init()
+            for key in [key for key in self.cache if key[0] == "font"]:
+                del self.cache[key]
+        return self.get(("font", size), lambda: pygame.font.Font(None, size))
+
+    def image(self, path, size=None):
+        return self.get(("image", path, size), lambda: self.load_image(path, size))
+
+    def preload_image(self, path, size=None):
+        self.preload(("image", path, size), lambda: self.load_image(path, size))
+
+    def load_image(self, path, size=None):
+        # None when the file is missing or unreadable
+        try:
+            image = pygame.image.load(path)
+        except (pygame.error, OSError):
+            return None
+        return pygame.transform.scale(image, size) if size else image
+
+assets = Assets()
+
+# Pickups are bucketed into fixed-width x cells so collision and drawing only
+# visit the cells near the car or the screen. Collected items leave the index
+# immediately and whole cells are evicted once the camera has passed them.
+class SpatialIndex:
+    def __init__(self, cell_width=ENTITY_CELL_WIDTH):
+        self.cell_width = cell_width
+        self.cells = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for key in sorted(self.cells):
+            yield from self.cells[key]
+
+    def cell_of(self, x):
+        return math.floor(x / self.cell_width)
+
+    def add(self, entity):
+        self.cells.setdefault(self.cell_of(entity.x), []).append(entity)
+        self.count += 1
+
+    def remove(self, entity):
+        key = self.cell_of(entity.x)
+        cell = self.cells[key]
+        cell.remove(entity)
+        if not cell:
+            del self.cells[key]
+        self.count -= 1
+
+    def near(self, x_min, x_max):
+        found = []
+        for key in range(self.cell_of(x_min), self.cell_of(x_max) + 1):
+            cell = self.cells.get(key)
+            if cell:
+                found.extend(cell)
+        return found
+
+    def copy_near(self, x_min, x_max):
+        # A new index holding copies of the entities near [x_min, x_max]
+        index = SpatialIndex(self.cell_width)
+        for key in range(self.cell_of(x_min), self.cell_of(x_max) + 1):
+            cell = self.cells.get(key)
+            if cell:
+                index.cells[key] = [entity.copy() for entity in cell]
+                index.count += len(cell)
+        return index
+
+    def evict_before(self, x):
+        first = self.cell_of(x)
+        for key in [key for key in self.cells if key < first]:
+            self.count -= len(self.cells.pop(key))
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
 
 class Coin:
+    __slots__ = ("x", "y", "collected", "radius", "angle")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -153,41 +750,55 @@ class Coin:
         self.radius = 15
         self.angle = 0
         
+    def copy(self):
+        coin = Coin(self.x, self.y)
+        coin.angle = self.angle
+        return coin
+
     def update(self):
         self.angle += 0.1
         
-    def draw(self, screen, camera):
+    def draw(self, screen, sx, sy):
         if not self.collected:
-            sx, sy = camera.world_to_screen(self.x, self.y)
-            if -50 <= sx <= SCREEN_WIDTH + 50:
-                scale = abs(math.cos(self.angle))
-                width = int(self.radius * 2 * scale)
-                if width > 2:
-                    pygame.draw.ellipse(screen, COIN_COLOR, (sx - width // 2, sy - self.radius, width, self.radius * 2))
-                    pygame.draw.ellipse(screen, (218, 165, 32), (sx - width // 2, sy - self.radius, width, self.radius * 2), 2)
+            scale = abs(math.cos(self.angle))
+            width = int(self.radius * 2 * scale)
+            if width > 2:
+                frame = sprite_cache.get(("coin", self.radius, width), lambda: self.render_frame(width))
+                screen.blit(frame, (sx - width // 2, sy - self.radius))
+
+    def render_frame(self, width):
+        frame = pygame.Surface((width, self.radius * 2), pygame.SRCALPHA)
+        pygame.draw.ellipse(frame, COIN_COLOR, (0, 0, width, self.radius * 2))
+        pygame.draw.ellipse(frame, (218, 165, 32), (0, 0, width, self.radius * 2), 2)
+        return frame
 
 class Island:
+    __slots__ = ("x", "y", "collected", "size")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.collected = False
         self.size = 25
         
-    def draw(self, screen, camera):
+    def copy(self):
+        return Island(self.x, self.y)
+
+    def draw(self, screen, sx, sy):
         if not self.collected:
-            sx, sy = camera.world_to_screen(self.x, self.y)
-            if -50 <= sx <= SCREEN_WIDTH + 50:
-                # Island base (sand)
-                pygame.draw.ellipse(screen, (194, 178, 128), (sx - self.size, sy - 10, self.size * 2, 20))
-                # Palm tree trunk
-                pygame.draw.rect(screen, (139, 90, 43), (sx - 3, sy - 20, 6, 15))
-                # Palm leaves
-                for angle in [0, math.pi/3, 2*math.pi/3, math.pi, 4*math.pi/3, 5*math.pi/3]:
-                    leaf_x = sx + math.cos(angle) * 12
-                    leaf_y = sy - 20 + math.sin(angle) * 8
-                    pygame.draw.line(screen, (34, 139, 34), (sx, sy - 20), (leaf_x, leaf_y), 3)
+            # Island base (sand)
+            pygame.draw.ellipse(screen, (194, 178, 128), (sx - self.size, sy - 10, self.size * 2, 20))
+            # Palm tree trunk
+            pygame.draw.rect(screen, (139, 90, 43), (sx - 3, sy - 20, 6, 15))
+            # Palm leaves
+            for angle in [0, math.pi/3, 2*math.pi/3, math.pi, 4*math.pi/3, 5*math.pi/3]:
+                leaf_x = sx + math.cos(angle) * 12
+                leaf_y = sy - 20 + math.sin(angle) * 8
+                pygame.draw.line(screen, (34, 139, 34), (sx, sy - 20), (leaf_x, leaf_y), 3)
 
 class Obstacle:
+    __slots__ = ("x", "y", "type", "active", "size")
+
     def __init__(self, x, y, type_name):
         self.x = x
         self.y = y
@@ -195,69 +806,106 @@ class Obstacle:
         self.active = True
         self.size = 30
         
-    def draw(self, screen, camera):
+    def copy(self):
+        return Obstacle(self.x, self.y, self.type)
+
+    def draw(self, screen, sx, sy):
         if self.active:
-            sx, sy = camera.world_to_screen(self.x, self.y)
-            if -50 <= sx <= SCREEN_WIDTH + 50:
-                if self.type == "fuel":
-                    pygame.draw.rect(screen, (0, 200, 0), (sx - 15, sy - 25, 30, 40))
-                    pygame.draw.rect(screen, (0, 255, 0), (sx - 12, sy - 22, 24, 34))
-                    pygame.draw.rect(screen, (255, 255, 255), (sx - 8, sy - 18, 16, 10))
+            if self.type == "fuel":
+                pygame.draw.rect(screen, (0, 200, 0), (sx - 15, sy - 25, 30, 40))
+                pygame.draw.rect(screen, (0, 255, 0), (sx - 12, sy - 22, 24, 34))
+                pygame.draw.rect(screen, (255, 255, 255), (sx - 8, sy - 18, 16, 10))
 
 class Car:
-    def __init__(self, x, y):
+    def __init__(self, x, y, gravity=GRAVITY, max_tilt_angle=MAX_TILT_ANGLE,
+                 max_landing_speed=MAX_LANDING_SPEED, fuel_consumption=FUEL_CONSUMPTION,
+                 jump_force=JUMP_FORCE):
+        self.width = 70
+        self.height = 60
+        self.wheel_radius = 20
+        self.wheel_base = 40
+        self.gravity = gravity
+        self.max_tilt_angle = max_tilt_angle
+        self.max_landing_speed = max_landing_speed
+        self.fuel_consumption = fuel_consumption
+        self.jump_force = jump_force
+        # The image is loaded on first draw so headless simulations never
+        # touch the filesystem or pygame
+        self.image = None
+        self.image_loaded = False
+        self.reset(x, y)
+        
+    def reset(self, x, y):
+        # Back to a fresh car at (x, y), keeping the constants and loaded image
         self.x = x
         self.y = y
         self.vx = 0
         self.vy = 0
         self.angle = 0
         self.angular_velocity = 0
-        self.width = 70
-        self.height = 60
-        self.wheel_radius = 20
-        self.wheel_base = 40
         self.front_wheel_angle = 0
         self.rear_wheel_angle = 0
+        self.prev_x = x
+        self.prev_y = y
+        self.prev_angle = 0
         self.fuel = 100
         self.crashed = False
+        self.crash_cause = None
         self.on_ground = False
         self.can_jump = True
         self.suspension_front = 0
         self.suspension_rear = 0
-        self.image = None
-        self.load_image()
         
+    # Dynamic state for snapshots: 14 floats, 3 flags and the crash cause
+    STATE = struct.Struct("<14d3?B")
+    CRASH_CAUSES = (None, "landing", "tilt")
+
+    def snapshot(self):
+        return self.STATE.pack(self.x, self.y, self.vx, self.vy, self.angle, self.angular_velocity,
+                               self.front_wheel_angle, self.rear_wheel_angle, self.prev_x, self.prev_y,
+                               self.prev_angle, self.fuel, self.suspension_front, self.suspension_rear,
+                               self.crashed, self.on_ground, self.can_jump,
+                               self.CRASH_CAUSES.index(self.crash_cause))
+
+    def restore(self, data, offset):
+        (self.x, self.y, self.vx, self.vy, self.angle, self.angular_velocity,
+         self.front_wheel_angle, self.rear_wheel_angle, self.prev_x, self.prev_y,
+         self.prev_angle, self.fuel, self.suspension_front, self.suspension_rear,
+         self.crashed, self.on_ground, self.can_jump, cause) = self.STATE.unpack_from(data, offset)
+        self.crash_cause = self.CRASH_CAUSES[cause]
+        return offset + self.STATE.size
+
     def load_image(self):
-        try:
-            self.image = pygame.image.load("../eyevine01306955-2-removebg-preview.png")
-            self.image = pygame.transform.scale(self.image, (80, 80))
-        except:
-            self.image = None
+        self.image_loaded = True
+        self.image = assets.image(CAR_IMAGE, CAR_IMAGE_SIZE)
         
-    def update(self, keys, terrain):
+    def update(self, controls, terrain):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.prev_angle = self.angle
         if self.crashed:
             return
             
         # Input
         accelerating = False
-        if keys[pygame.K_RIGHT] and self.fuel > 0:
+        if controls.throttle and self.fuel > 0:
             if self.on_ground:
                 self.vx += 0.3
-            self.fuel -= FUEL_CONSUMPTION
+            self.fuel -= self.fuel_consumption
             accelerating = True
-        if keys[pygame.K_LEFT] and self.on_ground:
+        if controls.brake and self.on_ground:
             self.vx -= 0.2
-        if keys[pygame.K_SPACE] and self.on_ground and self.can_jump:
+        if controls.jump and self.on_ground and self.can_jump:
             jump_boost = min(abs(self.vx) * 0.5, 5)
-            self.vy = -(JUMP_FORCE + jump_boost)
+            self.vy = -(self.jump_force + jump_boost)
             self.can_jump = False
-        if keys[pygame.K_UP] and not self.on_ground:
+        if controls.tilt_back and not self.on_ground:
             self.angular_velocity -= 0.005
-        if keys[pygame.K_DOWN] and not self.on_ground:
+        if controls.tilt_forward and not self.on_ground:
             self.angular_velocity += 0.005
             
         # Physics
-        self.vy += GRAVITY
+        self.vy += self.gravity
         self.vx *= 0.99
         self.x += self.vx
         self.y += self.vy
@@ -278,14 +926,16 @@ class Car:
         
         if front_y + self.wheel_radius > front_ground:
             front_y = front_ground - self.wheel_radius
-            if self.vy > MAX_LANDING_SPEED:
+            if self.vy > self.max_landing_speed:
                 self.crashed = True
+                self.crash_cause = "landing"
             self.on_ground = True
             
         if rear_y + self.wheel_radius > rear_ground:
             rear_y = rear_ground - self.wheel_radius
-            if self.vy > MAX_LANDING_SPEED:
+            if self.vy > self.max_landing_speed:
                 self.crashed = True
+                self.crash_cause = "landing"
             self.on_ground = True
             
         if self.on_ground:
@@ -307,8 +957,9 @@ class Car:
         angle_deg = abs(math.degrees(self.angle) % 360)
         if angle_deg > 180:
             angle_deg = 360 - angle_deg
-        if angle_deg > MAX_TILT_ANGLE and self.on_ground:
+        if angle_deg > self.max_tilt_angle and self.on_ground:
             self.crashed = True
+            self.crash_cause = self.crash_cause or "tilt"
             
         # Wheel rotation
         if self.on_ground:
@@ -317,128 +968,337 @@ class Car:
             
         return accelerating
         
-    def draw(self, screen, camera):
-        sx, sy = camera.world_to_screen(self.x, self.y)
+    def draw(self, screen, camera, alpha=1.0, wheel_spokes=8):
+        if not self.image_loaded:
+            self.load_image()
+        x, y, body_angle = self.interpolate(alpha)
+        sx, sy = camera.world_to_screen(x, y)
         
-        # Draw character image if loaded
+        # Body and wheels come from the sprite cache, rotated to the nearest
+        # of BODY_ANGLE_STEPS angles / WHEEL_PHASE_STEPS spoke phases
+        step = round(body_angle / (2 * math.pi) * BODY_ANGLE_STEPS) % BODY_ANGLE_STEPS
         if self.image:
-            rotated_image = pygame.transform.rotate(self.image, -math.degrees(self.angle))
-            image_rect = rotated_image.get_rect(center=(int(sx), int(sy - 10)))
-            screen.blit(rotated_image, image_rect)
+            body = sprite_cache.get(("car", id(self.image), step), lambda: self.render_body(step))
+            screen.blit(body, body.get_rect(center=(int(sx), int(sy - 10))))
         else:
             # Fallback: Draw simple rectangle if image not found
-            body_points = []
-            for dx, dy in [(-25, -20), (25, -20), (25, 10), (-25, 10)]:
-                rx = dx * math.cos(self.angle) - dy * math.sin(self.angle)
-                ry = dx * math.sin(self.angle) + dy * math.cos(self.angle)
-                body_points.append((sx + rx, sy + ry))
-            pygame.draw.polygon(screen, (100, 100, 200), body_points)
+            body = sprite_cache.get(("car", None, step), lambda: self.render_body(step))
+            screen.blit(body, body.get_rect(center=(int(sx), int(sy))))
         
         # Wheels with suspension
         for i, offset in enumerate([-self.wheel_base / 2, self.wheel_base / 2]):
             susp = self.suspension_rear if i == 0 else self.suspension_front
-            wx = sx + math.cos(self.angle) * offset
-            wy = sy + math.sin(self.angle) * offset + susp
+            wx = sx + math.cos(body_angle) * offset
+            wy = sy + math.sin(body_angle) * offset + susp
             
             # Suspension
-            spring_top_x = sx + math.cos(self.angle) * offset
-            spring_top_y = sy + math.sin(self.angle) * offset + 10
+            spring_top_x = sx + math.cos(body_angle) * offset
+            spring_top_y = sy + math.sin(body_angle) * offset + 10
             pygame.draw.line(screen, (150, 150, 150), (spring_top_x, spring_top_y), (wx, wy), 2)
             
-            # Wheels
-            pygame.draw.circle(screen, (50, 50, 50), (int(wx), int(wy)), self.wheel_radius)
-            pygame.draw.circle(screen, (30, 30, 30), (int(wx), int(wy)), self.wheel_radius - 3)
-            pygame.draw.circle(screen, (80, 80, 80), (int(wx), int(wy)), self.wheel_radius - 6)
-            
-            # Spokes
+            # Wheels (n spokes, so the pattern repeats every 360/n degrees)
             angle = self.front_wheel_angle if offset > 0 else self.rear_wheel_angle
-            for spoke_angle in [angle, angle + math.pi / 4, angle + math.pi / 2, angle + 3 * math.pi / 4,
-                               angle + math.pi, angle + 5 * math.pi / 4, angle + 3 * math.pi / 2, angle + 7 * math.pi / 4]:
-                spoke_x = wx + math.cos(spoke_angle) * (self.wheel_radius - 8)
-                spoke_y = wy + math.sin(spoke_angle) * (self.wheel_radius - 8)
-                pygame.draw.line(screen, (150, 150, 150), (wx, wy), (spoke_x, spoke_y), 1)
+            period = 2 * math.pi / max(wheel_spokes, 1)
+            phase = round((angle % period) / period * WHEEL_PHASE_STEPS) % WHEEL_PHASE_STEPS if wheel_spokes else 0
+            wheel = sprite_cache.get(("wheel", self.wheel_radius, wheel_spokes, phase),
+                                     lambda: self.render_wheel(phase, wheel_spokes))
+            screen.blit(wheel, (int(wx) - self.wheel_radius, int(wy) - self.wheel_radius))
 
-class Game:
-    def __init__(self):
-        pygame.init()
-        pygame.mixer.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Hill Climb Racing - Custom Character")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        self.engine_sound_playing = False
-        self.reset()
+    def interpolate(self, alpha):
+        # Position and angle between the last two physics states; the angle
+        # takes the short way round so a wrap from +pi to -pi doesn't spin
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        turn = (self.angle - self.prev_angle + math.pi) % (2 * math.pi) - math.pi
+        return x, y, self.prev_angle + turn * alpha
+
+    def screen_rect(self, camera, alpha=1.0):
+        # Covers the body, wheels and anything the car can pick up this frame
+        x, y, _ = self.interpolate(alpha)
+        sx, sy = camera.world_to_screen(x, y)
+        return pygame.Rect(int(sx) - 90, int(sy) - 90, 180, 180)
+
+    def render_body(self, step):
+        angle = step / BODY_ANGLE_STEPS * 2 * math.pi
+        if self.image:
+            return pygame.transform.rotate(self.image, -math.degrees(angle))
+        half = 33
+        body = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+        body_points = []
+        for dx, dy in [(-25, -20), (25, -20), (25, 10), (-25, 10)]:
+            rx = dx * math.cos(angle) - dy * math.sin(angle)
+            ry = dx * math.sin(angle) + dy * math.cos(angle)
+            body_points.append((half + rx, half + ry))
+        pygame.draw.polygon(body, (100, 100, 200), body_points)
+        return body
+
+    def render_wheel(self, phase, spokes=8):
+        r = self.wheel_radius
+        wheel = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+        pygame.draw.circle(wheel, (50, 50, 50), (r, r), r)
+        pygame.draw.circle(wheel, (30, 30, 30), (r, r), r - 3)
+        pygame.draw.circle(wheel, (80, 80, 80), (r, r), r - 6)
         
+        # Spokes
+        angle = phase / WHEEL_PHASE_STEPS * 2 * math.pi / max(spokes, 1)
+        for k in range(spokes):
+            spoke_angle = angle + k * 2 * math.pi / spokes
+            spoke_x = r + math.cos(spoke_angle) * (r - 8)
+            spoke_y = r + math.sin(spoke_angle) * (r - 8)
+            pygame.draw.line(wheel, (150, 150, 150), (r, r), (spoke_x, spoke_y), 1)
+        return wheel
+
+class MountainLayer:
+    STRIP_WIDTH = 1600
+    SAMPLE_SPACING = 50
+    strips_rendered = 0
+
+    def __init__(self, layer):
+        self.layer = layer
+        self.parallax = 0.1 + layer * 0.05
+        color_val = 100 - layer * 20
+        self.color = (color_val, color_val, color_val + 50)
+        self.top = 200 + layer * 50 - 80
+        self.strips = {}
+
+    def height_at(self, world_x):
+        return 200 + self.layer * 50 + math.sin(world_x * 0.005) * 50 + math.sin(world_x * 0.01) * 30
+
+    def render_strip(self, index):
+        # One pixel wider than the strip so neighbours overlap without a seam
+        MountainLayer.strips_rendered += 1
+        strip = pygame.Surface((self.STRIP_WIDTH + 1, SCREEN_HEIGHT - self.top))
+        strip.fill((255, 0, 255))
+        strip.set_colorkey((255, 0, 255))
+        start = index * self.STRIP_WIDTH
+        points = []
+        for x in range(0, self.STRIP_WIDTH + 1, self.SAMPLE_SPACING):
+            points.append((x, self.height_at(start + x) - self.top))
+        points.append((self.STRIP_WIDTH, SCREEN_HEIGHT - self.top))
+        points.append((0, SCREEN_HEIGHT - self.top))
+        pygame.draw.polygon(strip, self.color, points)
+        return strip
+
+    def scroll(self, camera_x):
+        # Screen x of world x 0 for this layer
+        return math.floor(-camera_x * self.parallax)
+
+    def draw(self, screen, camera_x):
+        offset = camera_x * self.parallax
+        scroll = self.scroll(camera_x)
+        first = math.floor(offset / self.STRIP_WIDTH)
+        last = math.floor((offset + SCREEN_WIDTH) / self.STRIP_WIDTH)
+        for index in list(self.strips):
+            if not first <= index <= last:
+                del self.strips[index]
+        for index in range(first, last + 1):
+            strip = self.strips.get(index)
+            if strip is None:
+                strip = self.strips[index] = self.render_strip(index)
+            screen.blit(strip, (index * self.STRIP_WIDTH + scroll, self.top))
+
+class Controls:
+    def __init__(self, throttle=False, brake=False, jump=False, tilt_back=False, tilt_forward=False):
+        self.throttle = throttle
+        self.brake = brake
+        self.jump = jump
+        self.tilt_back = tilt_back
+        self.tilt_forward = tilt_forward
+
+    @classmethod
+    def from_keys(cls, keys):
+        return cls(
+            throttle=keys[pygame.K_RIGHT],
+            brake=keys[pygame.K_LEFT],
+            jump=keys[pygame.K_SPACE],
+            tilt_back=keys[pygame.K_UP],
+            tilt_forward=keys[pygame.K_DOWN],
+        )
+
+class Controller:
+    # Source of Controls for each simulation step (keyboard, script or bot)
+    def get_controls(self, sim):
+        raise NotImplementedError
+
+class KeyboardController(Controller):
+    def get_controls(self, sim):
+        return Controls.from_keys(pygame.key.get_pressed())
+
+class ScriptedController(Controller):
+    # Plays back a list of Controls, one per frame, then holds the last entry
+    def __init__(self, script):
+        self.script = list(script) or [Controls()]
+
+    def get_controls(self, sim):
+        return self.script[min(sim.frame, len(self.script) - 1)]
+
+class BotController(Controller):
+    # Holds a cruising speed, leaning against the tilt while airborne
+    def __init__(self, max_speed=4, tilt_tolerance=0.1):
+        self.max_speed = max_speed
+        self.tilt_tolerance = tilt_tolerance
+
+    def get_controls(self, sim):
+        car = sim.car
+        controls = Controls(throttle=car.vx < self.max_speed)
+        if not car.on_ground:
+            controls.tilt_back = car.angle > self.tilt_tolerance
+            controls.tilt_forward = car.angle < -self.tilt_tolerance
+        return controls
+
+INPUT_BITS = ("throttle", "brake", "jump", "tilt_back", "tilt_forward")
+RESTART_BIT = 1 << len(INPUT_BITS)
+
+def controls_to_mask(controls):
+    mask = 0
+    for bit, name in enumerate(INPUT_BITS):
+        if getattr(controls, name):
+            mask |= 1 << bit
+    return mask
+
+def mask_to_controls(mask):
+    return Controls(*(bool(mask & (1 << bit)) for bit in range(len(INPUT_BITS))))
+
+# Snapshot encoding of a random.Random: its cached gauss value (NaN for none)
+# and the 624-word Mersenne Twister state plus position
+RANDOM_STATE = struct.Struct("<d625I")
+
+def pack_random(rng):
+    _, state, gauss = rng.getstate()
+    return RANDOM_STATE.pack(math.nan if gauss is None else gauss, *state)
+
+def unpack_random(rng, data, offset):
+    values = RANDOM_STATE.unpack_from(data, offset)
+    gauss = None if math.isnan(values[0]) else values[0]
+    rng.setstate((3, values[1:], gauss))
+    return offset + RANDOM_STATE.size
+
+# Compact binary log of a play session: the master seed followed by the input
+# bitmask (INPUT_BITS plus RESTART_BIT) stored only on the frames where it
+# changes. Together with the seed this replays a session exactly.
+class InputLog:
+    MAGIC = b"HCIL"
+    VERSION = 1
+    HEADER = struct.Struct("<4sBqI")
+    RECORD = struct.Struct("<IB")
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.frames = 0
+        self.change_frames = []
+        self.change_masks = []
+
+    def record(self, frame, mask):
+        if not self.change_masks or self.change_masks[-1] != mask:
+            self.change_frames.append(frame)
+            self.change_masks.append(mask)
+        self.frames = frame + 1
+
+    def mask_at(self, frame):
+        i = bisect_right(self.change_frames, frame) - 1
+        return self.change_masks[i] if i >= 0 else 0
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.seed, self.frames))
+            for frame, mask in zip(self.change_frames, self.change_masks):
+                f.write(self.RECORD.pack(frame, mask))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, frames = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"{path} is not a version {cls.VERSION} input log")
+        log = cls(seed)
+        for frame, mask in cls.RECORD.iter_unpack(data[cls.HEADER.size:]):
+            log.change_frames.append(frame)
+            log.change_masks.append(mask)
+        log.frames = frames
+        return log
+
+class Simulation:
+    # Game rules without any rendering: car, terrain, pickups and scoring.
+    # Steps as fast as it is called and never touches the display.
+    #
+    # Every reset starts a session with its own seed drawn from the master
+    # seed, and each subsystem (spawning, particles, camera shake) gets an
+    # independent RNG stream derived from it, so a seed plus the inputs fully
+    # determine a run.
+    #
+    # physics overrides Car's tunable constants (gravity, max_tilt_angle, ...)
+    # and generator can be a seeded TerrainGenerator, for tuning sweeps.
+    def __init__(self, controller=None, seed=None, physics=None, generator=None):
+        self.controller = controller or BotController()
+        self.physics = physics or {}
+        self.generator = generator or terrain_generator
+        self.car = None
+        self.reseed(seed)
+        self.reset()
+
+    def reseed(self, seed=None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        self.seed = seed
+        self.seeds = random.Random(seed)
+
     def reset(self):
-        self.car = Car(100, 300)
-        self.terrain = Terrain()
-        self.camera = Camera()
-        self.particles = ParticleSystem()
-        self.coins = []
-        self.islands = []
-        self.obstacles = []
+        self.session_seed = self.seeds.getrandbits(63)
+        spawn_seed, self.particle_seed, camera_seed = np.random.SeedSequence(self.session_seed).generate_state(3).tolist()
+        # The first reset builds the world; later ones put the same objects
+        # back to their starting state, keeping the car's loaded image and the
+        # terrain's starting heights and chunk surfaces
+        if self.car is None:
+            self.build(spawn_seed, camera_seed)
+        else:
+            self.rng.seed(spawn_seed)
+            self.car.reset(100, 300)
+            self.terrain.reset()
+            self.camera.reset(camera_seed)
+            self.coins.clear()
+            self.islands.clear()
+            self.obstacles.clear()
         self.distance = 0
         self.score = 0
         self.coin_count = 0
-        self.running = True
+        self.fuel_pickups = 0
         self.game_over = False
+        self.accelerating = False
+        self.frame = 0
         self.spawn_timer = 0
         self.milestone_message = ""
         self.milestone_timer = 0
         self.last_milestone = 0
         
         # Spawn initial items
-        for i in range(10):
-            x = random.randint(200, 5000)
-            y = self.terrain.get_ground_y(x) - 50
-            self.coins.append(Coin(x, y))
+        coin_xs = [self.rng.randint(200, 5000) for i in range(10)]
+        for x, ground_y in zip(coin_xs, self.terrain.get_ground_y_many(coin_xs)):
+            self.coins.add(Coin(x, float(ground_y) - 50))
             
-        for i in range(5):
-            x = random.randint(300, 5000)
-            y = self.terrain.get_ground_y(x) - 40
-            self.obstacles.append(Obstacle(x, y, "fuel"))
-        
-    def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r and self.game_over:
-                    self.reset()
-                    self.game_over = False
-                    
-    def update(self):
+        fuel_xs = [self.rng.randint(300, 5000) for i in range(5)]
+        for x, ground_y in zip(fuel_xs, self.terrain.get_ground_y_many(fuel_xs)):
+            self.obstacles.add(Obstacle(x, float(ground_y) - 40, "fuel"))
+
+    def build(self, spawn_seed=None, camera_seed=None):
+        self.rng = random.Random(spawn_seed)
+        self.car = Car(100, 300, **self.physics)
+        self.terrain = Terrain(generator=self.generator)
+        self.camera = Camera(camera_seed)
+        self.coins = SpatialIndex()
+        self.islands = SpatialIndex()
+        self.obstacles = SpatialIndex()
+
+    def step(self, controls=None):
         if self.game_over:
-            return
-            
-        keys = pygame.key.get_pressed()
-        accelerating = self.car.update(keys, self.terrain)
-        
-        speed = abs(self.car.vx)
-        
-        if accelerating and self.car.on_ground:
-            exhaust_x = self.car.x - math.cos(self.car.angle) * 35
-            exhaust_y = self.car.y - math.sin(self.car.angle) * 35
-            
-            if speed < 2:
-                smoke_colors = [(0, 200, 0), (50, 255, 50), (100, 255, 100)]
-                particle_count = 5
-                particle_size = 8
-            elif speed < 5:
-                smoke_colors = [(255, 255, 0), (255, 200, 0), (200, 200, 0)]
-                particle_count = 8
-                particle_size = 12
-            else:
-                smoke_colors = [(255, 0, 0), (255, 100, 0), (200, 0, 0)]
-                particle_count = 12
-                particle_size = 16
-                
-            self.particles.emit(exhaust_x, exhaust_y, particle_count, smoke_colors, (2, 5), particle_size)
+            return False
+        if controls is None:
+            controls = self.controller.get_controls(self)
             
+        self.accelerating = bool(self.car.update(controls, self.terrain))
         self.terrain.update(self.camera.x)
         self.camera.update(self.car.x, self.car.y)
-        self.particles.update()
+        self.frame += 1
         
         # Update distance and score
         self.distance = max(0, int(self.car.x / 10))
@@ -453,189 +1313,1216 @@ class Game:
             # Spawn island at current position
             island_x = self.car.x + 100
             island_y = self.terrain.get_ground_y(island_x) - 30
-            self.islands.append(Island(island_x, island_y))
+            self.islands.add(Island(island_x, island_y))
         
         # Update milestone timer
         if self.milestone_timer > 0:
             self.milestone_timer -= 1
         
+        # Coin spin only matters for coins that can be drawn
+        view_min = self.camera.x - ENTITY_VIEW_MARGIN
+        view_max = self.camera.x + SCREEN_WIDTH + ENTITY_VIEW_MARGIN
+        for coin in self.coins.near(view_min, view_max):
+            coin.update()
+        
+        car_x, car_y = self.car.x, self.car.y
+        
         # Coin collection
-        for coin in self.coins:
-            if not coin.collected:
-                coin.update()
-                dist = math.sqrt((self.car.x - coin.x) ** 2 + (self.car.y - coin.y) ** 2)
-                if dist < 30:
-                    coin.collected = True
-                    self.coin_count += 1
+        for coin in self.coins.near(car_x - 30, car_x + 30):
+            if (car_x - coin.x) ** 2 + (car_y - coin.y) ** 2 < 30 ** 2:
+                coin.collected = True
+                self.coins.remove(coin)
+                self.coin_count += 1
         
         # Island collection
-        for island in self.islands:
-            if not island.collected:
-                dist = math.sqrt((self.car.x - island.x) ** 2 + (self.car.y - island.y) ** 2)
-                if dist < 40:
-                    island.collected = True
+        for island in self.islands.near(car_x - 40, car_x + 40):
+            if (car_x - island.x) ** 2 + (car_y - island.y) ** 2 < 40 ** 2:
+                island.collected = True
+                self.islands.remove(island)
                     
         # Obstacle interaction
-        for obs in self.obstacles:
-            if obs.active:
-                dist = math.sqrt((self.car.x - obs.x) ** 2 + (self.car.y - obs.y) ** 2)
-                if dist < 40:
-                    if obs.type == "fuel":
-                        self.car.fuel = min(100, self.car.fuel + 30)
-                        obs.active = False
+        for obs in self.obstacles.near(car_x - 40, car_x + 40):
+            if (car_x - obs.x) ** 2 + (car_y - obs.y) ** 2 < 40 ** 2:
+                if obs.type == "fuel":
+                    self.car.fuel = min(100, self.car.fuel + 30)
+                    self.fuel_pickups += 1
+                    obs.active = False
+                    self.obstacles.remove(obs)
+                    
+        # Forget everything the camera has left behind
+        behind = self.camera.x - ENTITY_EVICT_DISTANCE
+        self.coins.evict_before(behind)
+        self.islands.evict_before(behind)
+        self.obstacles.evict_before(behind)
                         
         # Spawn new items
         self.spawn_timer += 1
         if self.spawn_timer > 60:
             self.spawn_timer = 0
-            spawn_x = self.camera.x + SCREEN_WIDTH + random.randint(100, 500)
+            spawn_x = self.camera.x + SCREEN_WIDTH + self.rng.randint(100, 500)
             spawn_y = self.terrain.get_ground_y(spawn_x) - 50
             
-            if random.random() < 0.7:
-                self.coins.append(Coin(spawn_x, spawn_y))
+            if self.rng.random() < 0.7:
+                self.coins.add(Coin(spawn_x, spawn_y))
             else:
-                self.obstacles.append(Obstacle(spawn_x, spawn_y, "fuel"))
+                self.obstacles.add(Obstacle(spawn_x, spawn_y, "fuel"))
                 
         # Check game over
         if self.car.crashed or self.car.fuel <= 0:
             self.game_over = True
             if self.car.crashed:
-                self.particles.emit(self.car.x, self.car.y, 50, [(100, 100, 100), (150, 150, 150), (200, 200, 200)], (2, 6))
                 self.camera.shake(15, 30)
                 
-    def draw_gradient_sky(self):
-        for y in range(SCREEN_HEIGHT):
-            t = y / SCREEN_HEIGHT
-            r = int(SKY_TOP[0] + (SKY_BOTTOM[0] - SKY_TOP[0]) * t)
-            g = int(SKY_TOP[1] + (SKY_BOTTOM[1] - SKY_TOP[1]) * t)
-            b = int(SKY_TOP[2] + (SKY_BOTTOM[2] - SKY_TOP[2]) * t)
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (SCREEN_WIDTH, y))
-            
-    def draw_mountains(self):
-        for layer in range(3):
-            offset = self.camera.x * (0.1 + layer * 0.05)
-            points = []
-            for x in range(-100, SCREEN_WIDTH + 100, 50):
-                world_x = x + offset
-                height = 200 + layer * 50 + math.sin(world_x * 0.005) * 50 + math.sin(world_x * 0.01) * 30
-                points.append((x, height))
-            points.append((SCREEN_WIDTH + 100, SCREEN_HEIGHT))
-            points.append((-100, SCREEN_HEIGHT))
-            color_val = 100 - layer * 20
-            pygame.draw.polygon(self.screen, (color_val, color_val, color_val + 50), points)
-            
-    def draw_hud(self):
+        return self.accelerating
+
+    def run(self, max_frames=None):
+        # Step until game over (or max_frames), returning the frame count
+        while not self.game_over and (max_frames is None or self.frame < max_frames):
+            self.step()
+        return self.frame
+
+    def state_bytes(self):
+        car = self.car
+        return struct.pack("<8d2?3q", car.x, car.y, car.vx, car.vy, car.angle, car.angular_velocity,
+                           car.fuel, self.camera.x, car.crashed, car.on_ground,
+                           self.frame, self.coin_count, self.score)
+
+    def state_digest(self):
+        return hashlib.sha1(self.state_bytes()).hexdigest()
+
+    # Snapshot layout: header (magic, version, terrain seed), counters and the
+    # milestone message, car, camera and its shake RNG, terrain window,
+    # pickups, then the master and spawn RNGs. Everything else (constants,
+    # controller, generated terrain chunks) is shared configuration.
+    SNAPSHOT_MAGIC = b"HCSS"
+    SNAPSHOT_VERSION = 1
+    SNAPSHOT_HEADER = struct.Struct("<4sBq")
+    COUNTERS = struct.Struct("<11q2?H")
+    ENTITY_COUNTS = struct.Struct("<3I")
+    COIN = struct.Struct("<3d")
+    ISLAND = struct.Struct("<2d")
+    OBSTACLE = struct.Struct("<2d8s")
+
+    def snapshot(self):
+        # The whole mutable world as a few KB of bytes; restore() or fork()
+        # turn it back into a running simulation
+        message = self.milestone_message.encode("utf-8")
+        parts = [
+            self.SNAPSHOT_HEADER.pack(self.SNAPSHOT_MAGIC, self.SNAPSHOT_VERSION,
+                                      -1 if self.generator.seed is None else self.generator.seed),
+            self.COUNTERS.pack(self.seed, self.session_seed, self.particle_seed, self.distance, self.score,
+                               self.coin_count, self.fuel_pickups, self.frame, self.spawn_timer,
+                               self.milestone_timer, self.last_milestone, self.game_over, self.accelerating,
+                               len(message)),
+            message,
+            self.car.snapshot(),
+            self.camera.snapshot(),
+            self.terrain.snapshot(),
+            self.ENTITY_COUNTS.pack(len(self.coins), len(self.islands), len(self.obstacles)),
+        ]
+        parts.extend(self.COIN.pack(coin.x, coin.y, coin.angle) for coin in self.coins)
+        parts.extend(self.ISLAND.pack(island.x, island.y) for island in self.islands)
+        parts.extend(self.OBSTACLE.pack(obs.x, obs.y, obs.type.encode("ascii")) for obs in self.obstacles)
+        parts.append(pack_random(self.seeds))
+        parts.append(pack_random(self.rng))
+        return b"".join(parts)
+
+    def restore(self, data):
+        magic, version, terrain_seed = self.SNAPSHOT_HEADER.unpack_from(data)
+        if magic != self.SNAPSHOT_MAGIC:
+            raise ValueError("not a simulation snapshot")
+        if version != self.SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+        terrain_seed = None if terrain_seed == -1 else terrain_seed
+        if terrain_seed != self.generator.seed:
+            raise ValueError(f"snapshot is of terrain seed {terrain_seed}, not {self.generator.seed}")
+        offset = self.SNAPSHOT_HEADER.size
+
+        (self.seed, self.session_seed, self.particle_seed, self.distance, self.score,
+         self.coin_count, self.fuel_pickups, self.frame, self.spawn_timer,
+         self.milestone_timer, self.last_milestone, self.game_over, self.accelerating,
+         length) = self.COUNTERS.unpack_from(data, offset)
+        offset += self.COUNTERS.size
+        self.milestone_message = data[offset:offset + length].decode("utf-8")
+        offset += length
+
+        offset = self.car.restore(data, offset)
+        offset = self.camera.restore(data, offset)
+        offset = self.terrain.restore(data, offset)
+
+        coins, islands, obstacles = self.ENTITY_COUNTS.unpack_from(data, offset)
+        offset += self.ENTITY_COUNTS.size
+        self.coins.clear()
+        for x, y, angle in self.COIN.iter_unpack(data[offset:offset + coins * self.COIN.size]):
+            coin = Coin(x, y)
+            coin.angle = angle
+            self.coins.add(coin)
+        offset += coins * self.COIN.size
+        self.islands.clear()
+        for x, y in self.ISLAND.iter_unpack(data[offset:offset + islands * self.ISLAND.size]):
+            self.islands.add(Island(x, y))
+        offset += islands * self.ISLAND.size
+        self.obstacles.clear()
+        for x, y, type_name in self.OBSTACLE.iter_unpack(data[offset:offset + obstacles * self.OBSTACLE.size]):
+            self.obstacles.add(Obstacle(x, y, type_name.rstrip(b"\0").decode("ascii")))
+        offset += obstacles * self.OBSTACLE.size
+
+        offset = unpack_random(self.seeds, data, offset)
+        return unpack_random(self.rng, data, offset)
+
+    def fork(self, data=None, controller=None):
+        # A new simulation continuing from a snapshot (by default, this one's
+        # current state). Branches share the snapshot bytes, the controller
+        # unless given another, the physics constants and the terrain
+        # generator's chunk cache; only the small mutable world is their own.
+        sim = Simulation.__new__(Simulation)
+        sim.controller = controller or self.controller
+        sim.physics = self.physics
+        sim.generator = self.generator
+        sim.seeds = random.Random()
+        sim.build()
+        sim.restore(self.snapshot() if data is None else data)
+        return sim
+
+# Per-frame car, camera and entity state kept in preallocated column arrays.
+# Game.update writes one row per simulated frame without allocating; when the
+# buffer fills or a session ends, the filled columns go to a writer thread and
+# are saved as one compressed .npz part while recording carries on into a
+# second set of columns. load_telemetry() joins the parts back together.
+class Telemetry:
+    COLUMNS = {
+        "session": np.int64,
+        "frame": np.int32,
+        "x": np.float64,
+        "y": np.float64,
+        "vx": np.float32,
+        "vy": np.float32,
+        "angle": np.float32,
+        "fuel": np.float32,
+        "on_ground": np.bool_,
+        "suspension_front": np.float32,
+        "suspension_rear": np.float32,
+        "camera_x": np.float64,
+        "camera_y": np.float64,
+        "score": np.int32,
+        "coins": np.int16,
+        "islands": np.int16,
+        "obstacles": np.int16,
+        "particles": np.int16,
+    }
+
+    def __init__(self, directory, capacity=1 << 14):
+        self.directory = directory
+        self.capacity = capacity
+        os.makedirs(directory, exist_ok=True)
+        self.prefix = time.strftime("telemetry-%Y%m%d-%H%M%S")
+        self.buffers = [self.allocate(), self.allocate()]
+        self.columns = self.buffers[0]
+        self.count = 0
+        self.parts = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="telemetry")
+        self.pending = None
+
+    def allocate(self):
+        return {name: np.zeros(self.capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+
+    def record(self, sim, particles):
+        i = self.count
+        columns = self.columns
+        car = sim.car
+        camera = sim.camera
+        columns["session"][i] = sim.session_seed
+        columns["frame"][i] = sim.frame
+        columns["x"][i] = car.x
+        columns["y"][i] = car.y
+        columns["vx"][i] = car.vx
+        columns["vy"][i] = car.vy
+        columns["angle"][i] = car.angle
+        columns["fuel"][i] = car.fuel
+        columns["on_ground"][i] = car.on_ground
+        columns["suspension_front"][i] = car.suspension_front
+        columns["suspension_rear"][i] = car.suspension_rear
+        columns["camera_x"][i] = camera.x
+        columns["camera_y"][i] = camera.y
+        columns["score"][i] = sim.score
+        columns["coins"][i] = len(sim.coins)
+        columns["islands"][i] = len(sim.islands)
+        columns["obstacles"][i] = len(sim.obstacles)
+        columns["particles"][i] = particles
+        self.count = i + 1
+        if self.count == self.capacity:
+            self.flush()
+
+    def flush(self):
+        if self.count == 0:
+            return
+        # The other buffer is free once its write has finished
+        if self.pending is not None:
+            self.pending.result()
+        path = os.path.join(self.directory, f"{self.prefix}-{self.parts:05d}.npz")
+        filled = {name: column[:self.count] for name, column in self.columns.items()}
+        self.pending = self.executor.submit(np.savez_compressed, path, **filled)
+        self.parts += 1
+        self.columns = self.buffers[self.parts % 2]
+        self.count = 0
+
+    def close(self):
+        self.flush()
+        self.executor.shutdown(wait=True)
+        self.pending = None
+
+def load_telemetry(path):
+    # path is one .npz part, or a directory whose parts are joined in order
+    paths = sorted(glob.glob(os.path.join(path, "telemetry-*.npz"))) if os.path.isdir(path) else [path]
+    parts = []
+    for part in paths:
+        with np.load(part) as data:
+            parts.append({name: data[name] for name in data.files})
+    if not parts:
+        return {name: np.zeros(0, dtype=dtype) for name, dtype in Telemetry.COLUMNS.items()}
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+# Stats panel, milestone banner and game over screen. Rendered text is cached
+# by (font, text, color), and the stats panel is kept in its own surface where
+# a widget is only redrawn when the value it shows has changed.
+class Hud:
+    def __init__(self):
+        self.text_cache = SpriteCache(256)
+        self.panel = pygame.Surface((HUD_PANEL_WIDTH, HUD_PANEL_HEIGHT), pygame.SRCALPHA)
+        self.widget_values = {}
+        self.changed = False
+        self.banner_background = None
+        self.overlay = None
+
+    # Fonts load on first use, so starting up doesn't wait for all three
+    @property
+    def font(self):
+        return assets.font(36)
+
+    @property
+    def small_font(self):
+        return assets.font(24)
+
+    @property
+    def big_font(self):
+        return assets.font(72)
+
+    def text(self, font, text, color):
+        return self.text_cache.get((font, text, color), lambda: font.render(text, True, color))
+
+    def update_widget(self, name, rect, value, draw):
+        if self.widget_values.get(name) == value:
+            return
+        self.widget_values[name] = value
+        self.changed = True
+        self.panel.fill((0, 0, 0, 0), rect)
+        draw()
+
+    def draw_text_widget(self, name, font, text, color, pos):
+        rect = (pos[0], pos[1], HUD_PANEL_WIDTH - pos[0], font.get_linesize())
+        self.update_widget(name, rect, (text, color),
+                           lambda: self.panel.blit(self.text(font, text, color), pos))
+
+    def draw_fuel_bar(self, fuel):
         # Fuel bar
         fuel_width = 200
         fuel_height = 30
         fuel_x = 20
         fuel_y = 20
-        pygame.draw.rect(self.screen, (50, 50, 50), (fuel_x, fuel_y, fuel_width, fuel_height))
-        fuel_fill = int((self.car.fuel / 100) * fuel_width)
-        fuel_color = (0, 255, 0) if self.car.fuel > 30 else (255, 0, 0)
-        pygame.draw.rect(self.screen, fuel_color, (fuel_x, fuel_y, fuel_fill, fuel_height))
-        pygame.draw.rect(self.screen, (255, 255, 255), (fuel_x, fuel_y, fuel_width, fuel_height), 2)
+        fuel_fill = int((fuel / 100) * fuel_width)
+        fuel_color = (0, 255, 0) if fuel > 30 else (255, 0, 0)
+        fuel_label = f"Fuel: {int(fuel)}%"
         
-        fuel_text = self.small_font.render(f"Fuel: {int(self.car.fuel)}%", True, (255, 255, 255))
-        self.screen.blit(fuel_text, (fuel_x + 5, fuel_y + 5))
+        def draw():
+            pygame.draw.rect(self.panel, (50, 50, 50), (fuel_x, fuel_y, fuel_width, fuel_height))
+            pygame.draw.rect(self.panel, fuel_color, (fuel_x, fuel_y, fuel_fill, fuel_height))
+            pygame.draw.rect(self.panel, (255, 255, 255), (fuel_x, fuel_y, fuel_width, fuel_height), 2)
+            self.panel.blit(self.text(self.small_font, fuel_label, (255, 255, 255)), (fuel_x + 5, fuel_y + 5))
+            
+        self.update_widget("fuel", (fuel_x, fuel_y, fuel_width, fuel_height), (fuel_fill, fuel_color, fuel_label), draw)
+
+    def update(self, sim, quality=None):
+        # Redraws changed widgets into the panel; returns whether any changed
+        self.changed = False
+        car = sim.car
+        self.draw_fuel_bar(car.fuel)
         
         # Stats
         stats_y = 60
-        speed = abs(self.car.vx)
-        speed_text = self.small_font.render(f"Speed: {int(speed * 10)} km/h", True, (255, 255, 255))
-        self.screen.blit(speed_text, (20, stats_y))
+        speed = abs(car.vx)
+        difficulty = min(int(car.x / 1000) + 1, 10)
+        self.draw_text_widget("speed", self.small_font, f"Speed: {int(speed * 10)} km/h", (255, 255, 255), (20, stats_y))
+        self.draw_text_widget("distance", self.small_font, f"Distance: {sim.distance} m", (255, 255, 255), (20, stats_y + 30))
+        self.draw_text_widget("coins", self.small_font, f"Coins: {sim.coin_count}", (255, 215, 0), (20, stats_y + 60))
+        self.draw_text_widget("score", self.font, f"Score: {sim.score}", (255, 255, 255), (20, stats_y + 90))
+        self.draw_text_widget("level", self.small_font, f"Level: {difficulty}", (255, 255, 255), (20, stats_y + 130))
+        if quality is not None:
+            color = (200, 200, 200) if quality.level == 0 else (255, 160, 0)
+            self.draw_text_widget("quality", self.small_font, f"Quality: {quality.tier.name}", color, (20, stats_y + 160))
+        return self.changed
+
+    def draw(self, screen, sim, quality=None):
+        self.update(sim, quality)
+        screen.blit(self.panel, (0, 0))
+
+    def milestone_rect(self, sim):
+        if sim.milestone_timer <= 0:
+            return None
+        text = self.text(self.big_font, sim.milestone_message, (255, 0, 0))
+        return text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)).inflate(40, 20)
+
+    def draw_milestone(self, screen, sim):
+        # Draw milestone message in center
+        if sim.milestone_timer <= 0:
+            return
+        alpha = min(255, sim.milestone_timer * 2)
+        text = self.text(self.big_font, sim.milestone_message, (255, 0, 0))
+        text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
         
-        dist_text = self.small_font.render(f"Distance: {self.distance} m", True, (255, 255, 255))
-        self.screen.blit(dist_text, (20, stats_y + 30))
+        # Background for text
+        bg_rect = text_rect.inflate(40, 20)
+        if self.banner_background is None or self.banner_background.get_size() != bg_rect.size:
+            self.banner_background = pygame.Surface(bg_rect.size)
+            self.banner_background.fill((0, 0, 0))
+        self.banner_background.set_alpha(min(200, alpha))
+        screen.blit(self.banner_background, bg_rect)
         
-        coin_text = self.small_font.render(f"Coins: {self.coin_count}", True, (255, 215, 0))
-        self.screen.blit(coin_text, (20, stats_y + 60))
+        screen.blit(text, text_rect)
+
+    def draw_centered(self, screen, font, text, color, y_offset):
+        surface = self.text(font, text, color)
+        screen.blit(surface, surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + y_offset)))
+
+    def draw_game_over(self, screen, sim):
+        if self.overlay is None:
+            self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.overlay.set_alpha(200)
+            self.overlay.fill((0, 0, 0))
+        screen.blit(self.overlay, (0, 0))
         
-        score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (20, stats_y + 90))
+        reason = "Out of Fuel!" if sim.car.fuel <= 0 else "Crashed!"
+        self.draw_centered(screen, self.font, "GAME OVER", (255, 0, 0), -100)
+        self.draw_centered(screen, self.small_font, reason, (255, 255, 255), -50)
+        self.draw_centered(screen, self.font, f"Final Score: {sim.score}", (255, 215, 0), 0)
+        self.draw_centered(screen, self.small_font, f"Distance: {sim.distance} m", (255, 255, 255), 40)
+        self.draw_centered(screen, self.small_font, f"Coins: {sim.coin_count}", (255, 255, 255), 70)
+        self.draw_centered(screen, self.font, "Press R to Restart", (0, 255, 0), 120)
+
+class PhaseTimer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.events.append((self.name, self.start, time.perf_counter()))
+
+# Frame profiler for the game loop, toggled with F3. Times each phase of a
+# frame, keeps the last trace_seconds of frames for a Chrome/Perfetto trace
+# dump (F4), and draws a frame-time graph and per-phase breakdown on screen.
+class Profiler:
+    GRAPH_FRAMES = 240
+    GRAPH_HEIGHT = 80
+    GRAPH_MAX_MS = 50
+    PANEL_WIDTH = 300
+
+    def __init__(self, enabled=False, trace_seconds=10, fps=FPS):
+        self.enabled = enabled
+        self.fps = fps
+        self.budget_ms = 1000 / fps
+        self.frames = deque(maxlen=trace_seconds * fps)
+        self.frame_times = deque(maxlen=self.GRAPH_FRAMES)
+        self.origin = time.perf_counter()
+        self.events = None
+        self.frame_start = 0
+        self.frame_count = 0
+        self.lines = []
+        # Rendered once per change of self.lines, and the panel background
+        # once per panel height, instead of on every drawn frame
+        self.texts = []
+        self.background = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.events = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.events = []
+        self.frame_start = time.perf_counter()
+
+    def phase(self, name):
+        if self.events is None:
+            return nullcontext()
+        return PhaseTimer(self, name)
+
+    def end_frame(self, counters):
+        if self.events is None:
+            return
+        end = time.perf_counter()
+        self.frames.append((self.frame_start, end, self.events, counters))
+        self.frame_times.append(end - self.frame_start)
+        self.events = None
+        self.frame_count += 1
+        if self.frame_count % max(self.fps // 2, 1) == 0:
+            lines = self.breakdown()
+            if lines != self.lines:
+                self.lines = lines
+                font = assets.font(18)
+                self.texts = [font.render(line, True, (255, 255, 255)) for line in lines]
+
+    def breakdown(self):
+        # Mean ms per phase over the last second, slowest first
+        recent = list(self.frames)[-self.fps:]
+        totals = {}
+        for _, _, events, _ in recent:
+            for name, start, end in events:
+                totals[name] = totals.get(name, 0) + (end - start)
+        frame_ms = sum(end - start for start, end, _, _ in recent) / len(recent) * 1000
+        lines = [f"frame {frame_ms:5.2f} ms  ({self.fps} fps budget {self.budget_ms:.1f} ms)"]
+        for name, total in sorted(totals.items(), key=lambda item: -item[1]):
+            lines.append(f"{name:<16} {total / len(recent) * 1000:5.2f} ms")
+        counters = [f"{key} {value}" for key, value in recent[-1][3].items()]
+        for i in range(0, len(counters), 2):
+            lines.append("  ".join(counters[i:i + 2]))
+        return lines
+
+    def rect(self):
+        if not self.enabled or not self.frame_times:
+            return None
+        panel_height = self.GRAPH_HEIGHT + 14 * len(self.lines) + 10
+        return pygame.Rect(SCREEN_WIDTH - self.PANEL_WIDTH - 10, 10, self.PANEL_WIDTH, panel_height)
+
+    def draw(self, screen):
+        if not self.enabled or not self.frame_times:
+            return
+        x = SCREEN_WIDTH - self.PANEL_WIDTH - 10
+        panel_height = self.GRAPH_HEIGHT + 14 * len(self.lines) + 10
+        if self.background is None or self.background.get_height() != panel_height:
+            self.background = pygame.Surface((self.PANEL_WIDTH, panel_height))
+            self.background.set_alpha(180)
+            self.background.fill((0, 0, 0))
+        screen.blit(self.background, (x, 10))
+
+        # Frame-time graph with the frame budget marked in red
+        scale = self.GRAPH_HEIGHT / self.GRAPH_MAX_MS
+        bottom = 10 + self.GRAPH_HEIGHT
+        budget_y = bottom - self.budget_ms * scale
+        pygame.draw.line(screen, (255, 0, 0), (x, budget_y), (x + self.PANEL_WIDTH, budget_y))
+        step = self.PANEL_WIDTH / self.GRAPH_FRAMES
+        points = [(x + i * step, bottom - min(t * 1000, self.GRAPH_MAX_MS) * scale)
+                  for i, t in enumerate(self.frame_times)]
+        if len(points) > 1:
+            pygame.draw.lines(screen, (0, 255, 0), False, points)
+
+        for i, text in enumerate(self.texts):
+            screen.blit(text, (x + 5, bottom + 5 + i * 14))
+
+    def trace_events(self):
+        events = []
+        for start, end, phases, counters in self.frames:
+            events.append(self.trace_event("frame", start, end))
+            for name, phase_start, phase_end in phases:
+                events.append(self.trace_event(name, phase_start, phase_end))
+            events.append({"name": "counters", "ph": "C", "pid": 1, "tid": 1,
+                           "ts": (start - self.origin) * 1e6, "args": counters})
+        return events
+
+    def trace_event(self, name, start, end):
+        return {"name": name, "ph": "X", "pid": 1, "tid": 1,
+                "ts": (start - self.origin) * 1e6, "dur": (end - start) * 1e6}
+
+    def dump_trace(self, path=None):
+        path = path or time.strftime("trace-%Y%m%d-%H%M%S.json")
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+        return path
+
+def merge_rects(rects, limit):
+    # Merge overlapping rects; more than limit left over become their union
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    if len(merged) > limit:
+        return [merged[0].unionall(merged[1:])]
+    return merged
+
+# Builds frames from layers and presents only what changed. The background
+# (sky and mountains) is redrawn only when a mountain layer has moved a pixel.
+# The terrain layer is scrolled by the view's pixel delta, with only the
+# exposed strips redrawn. Sprites, effects and the HUD are drawn over them
+# every frame. While the view holds still, the previous frame stays on screen:
+# only the areas sprites covered this frame or last are restored from the
+# layers, and only those go out through pygame.display.update(rects).
+class Compositor:
+    COLORKEY = (255, 0, 255)
+    MAX_DIRTY_RECTS = 8
+
+    def __init__(self, size):
+        self.rect = pygame.Rect((0, 0), size)
+        self.background = pygame.Surface(size)
+        self.terrain = pygame.Surface(size)
+        self.terrain.set_colorkey(self.COLORKEY)
+        self.background_key = None
+        self.terrain_key = None
+        self.terrain_view = None
+        # The terrain layer is empty above this row, so blits can skip it
+        self.terrain_top = 0
+        self.layers_changed = True
+        self.frame_key = None
+        self.previous_rects = None
+        self.dirty = None
+
+    def invalidate(self):
+        self.previous_rects = None
+
+    def update_background(self, key, draw):
+        if key == self.background_key:
+            return
+        draw(self.background)
+        self.background_key = key
+        self.layers_changed = True
+
+    def update_terrain(self, view, key, top, draw):
+        # view: screen position of the world origin; key: anything else the
+        # terrain layer depends on (a change forces a full redraw); top: the
+        # highest screen row terrain can reach
+        self.terrain_top = min(max(top, 0), self.rect.height)
+        if key == self.terrain_key and view == self.terrain_view:
+            return
+        self.layers_changed = True
+        if key != self.terrain_key or self.terrain_view is None:
+            exposed = [self.rect]
+        else:
+            dx = view[0] - self.terrain_view[0]
+            dy = view[1] - self.terrain_view[1]
+            width, height = self.rect.size
+            if abs(dx) >= width or abs(dy) >= height:
+                exposed = [self.rect]
+            else:
+                self.terrain.scroll(dx, dy)
+                exposed = []
+                if dx:
+                    exposed.append(pygame.Rect(0 if dx > 0 else width + dx, 0, abs(dx), height))
+                if dy:
+                    exposed.append(pygame.Rect(0, 0 if dy > 0 else height + dy, width, abs(dy)))
+        for rect in exposed:
+            self.terrain.set_clip(rect)
+            self.terrain.fill(self.COLORKEY)
+            draw(self.terrain)
+        self.terrain.set_clip(None)
+        self.terrain_key = key
+        self.terrain_view = view
+
+    def begin_frame(self, screen, key, rects):
+        # key: anything whose change alters the whole frame (overlays, view);
+        # rects: where this frame draws things that can change between frames.
+        # Sets the screen clip to the area that needs drawing and returns
+        # False when nothing does.
+        rects = [rect for rect in rects if rect is not None]
+        if self.layers_changed or key != self.frame_key or self.previous_rects is None:
+            screen.set_clip(None)
+            screen.blit(self.background, (0, 0))
+            terrain = pygame.Rect(0, self.terrain_top, self.rect.width, self.rect.height - self.terrain_top)
+            screen.blit(self.terrain, terrain, terrain)
+            self.dirty = None
+        else:
+            changed = [rect.clip(self.rect) for rect in self.previous_rects + rects]
+            changed = [rect for rect in changed if rect.width and rect.height]
+            if not changed:
+                self.dirty = []
+                self.previous_rects = rects
+                return False
+            # Everything inside the union is recomposed, so presenting just
+            # the changed parts of it is enough
+            union = changed[0].unionall(changed[1:])
+            screen.set_clip(union)
+            screen.blit(self.background, union, union)
+            terrain = union.clip(0, self.terrain_top, self.rect.width, self.rect.height - self.terrain_top)
+            if terrain.width and terrain.height:
+                screen.blit(self.terrain, terrain, terrain)
+            self.dirty = merge_rects(changed, self.MAX_DIRTY_RECTS)
+        self.layers_changed = False
+        self.frame_key = key
+        self.previous_rects = rects
+        return True
+
+    def present(self, screen):
+        screen.set_clip(None)
+        if self.dirty is None:
+            pygame.display.flip()
+        elif self.dirty:
+            pygame.display.update(self.dirty)
+
+class QualityTier:
+    def __init__(self, name, particle_scale, mountain_layers, wheel_spokes, terrain_step):
+        self.name = name
+        # Fraction of each particle burst that is actually emitted
+        self.particle_scale = particle_scale
+        # Nearest mountain layers drawn (the far ones go first)
+        self.mountain_layers = mountain_layers
+        self.wheel_spokes = wheel_spokes
+        # Terrain outline uses every terrain_step-th segment
+        self.terrain_step = terrain_step
+
+QUALITY_TIERS = [
+    QualityTier("High", 1.0, 3, 8, 1),
+    QualityTier("Medium", 0.5, 2, 4, 2),
+    QualityTier("Low", 0.25, 1, 0, 3),
+]
+
+# Picks a QualityTier from recent frame times. Frame times are the work done
+# per frame (not the clock.tick sleep) so headroom is visible. Detail drops as
+# soon as the rolling mean goes over budget, but only comes back after a much
+# longer stretch well under it, so a tier that barely fits doesn't flicker.
+class QualityGovernor:
+    WINDOW_FRAMES = 30
+    DOWNGRADE_RATIO = 0.9
+    UPGRADE_RATIO = 0.5
+    UPGRADE_FRAMES = 180
+
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, adaptive=True, level=0):
+        self.budget_ms = budget_ms
+        self.adaptive = adaptive
+        self.level = level
+        self.samples = deque(maxlen=self.WINDOW_FRAMES)
+        self.calm_frames = 0
+
+    @property
+    def tier(self):
+        return QUALITY_TIERS[self.level]
+
+    def particles(self, count):
+        return max(1, round(count * self.tier.particle_scale))
+
+    def end_frame(self, frame_ms):
+        # Returns True when the tier changed
+        if not self.adaptive:
+            return False
+        self.samples.append(frame_ms)
+        if len(self.samples) < self.samples.maxlen:
+            return False
+        mean = sum(self.samples) / len(self.samples)
+        if mean > self.budget_ms * self.DOWNGRADE_RATIO and self.level < len(QUALITY_TIERS) - 1:
+            self.set_level(self.level + 1)
+            return True
+        self.calm_frames = self.calm_frames + 1 if mean < self.budget_ms * self.UPGRADE_RATIO else 0
+        if self.calm_frames >= self.UPGRADE_FRAMES and self.level > 0:
+            self.set_level(self.level - 1)
+            return True
+        return False
+
+    def set_level(self, level):
+        self.level = level
+        self.samples.clear()
+        self.calm_frames = 0
+
+def render_sky():
+    # One column of the vertical gradient, stretched across the screen
+    t = np.arange(SCREEN_HEIGHT)[:, None] / SCREEN_HEIGHT
+    top = np.array(SKY_TOP)
+    column = (top + (np.array(SKY_BOTTOM) - top) * t).astype(np.uint8)
+    column = pygame.image.frombuffer(column.tobytes(), (1, SCREEN_HEIGHT), "RGB")
+    sky = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    sky.blit(pygame.transform.scale(column, (SCREEN_WIDTH, SCREEN_HEIGHT)), (0, 0))
+    return sky
+
+# Wall time of each startup phase, from game.py starting its imports to the
+# first frame on screen, and the assets loaded along the way
+class StartupProfile:
+    def __init__(self, start=IMPORT_START):
+        self.start = start
+        self.last = start
+        self.phases = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def report(self):
+        lines = [f"Time to first frame: {(self.last - self.start) * 1000:.1f} ms"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<16} {seconds * 1000:7.1f} ms")
+        for key, seconds, background in assets.load_times:
+            kind, *args = key
+            label = f"{kind} {os.path.basename(str(args[0]))}" if args else kind
+            where = "background" if background else "on use"
+            lines.append(f"    {label}: {seconds * 1000:.1f} ms ({where})")
+        return "\n".join(lines)
+
+# Everything Game.draw reads from the simulation after one physics step, copied
+# so the simulation thread can carry on while the renderer draws it: the car
+# and camera (with their previous positions, for interpolation), the pickups
+# near the view, the particle arrays, the terrain window and the HUD counters.
+# time is when the step was due, for working out how far to interpolate.
+class FrameState:
+    def __init__(self, sim, particles, time):
+        camera = sim.camera
+        self.time = time
+        self.car = self.clone(sim.car)
+        self.camera = self.clone(camera)
+        self.terrain = sim.terrain.window()
+        # Interpolation can put the view anywhere between the last two camera positions
+        x_min = min(camera.prev_x, camera.x) - ENTITY_VIEW_MARGIN
+        x_max = max(camera.prev_x, camera.x) + SCREEN_WIDTH + ENTITY_VIEW_MARGIN
+        self.coins = sim.coins.copy_near(x_min, x_max)
+        self.islands = sim.islands.copy_near(x_min, x_max)
+        self.obstacles = sim.obstacles.copy_near(x_min, x_max)
+        self.particles = particles.frozen()
+        self.distance = sim.distance
+        self.score = sim.score
+        self.coin_count = sim.coin_count
+        self.milestone_message = sim.milestone_message
+        self.milestone_timer = sim.milestone_timer
+        self.game_over = sim.game_over
+
+    @staticmethod
+    def clone(obj):
+        # Shallow copy: the simulation only ever rebinds the car's and
+        # camera's attributes, and the one shared mutable value, the shake
+        # RNG, is only used by whoever draws
+        clone = object.__new__(type(obj))
+        clone.__dict__.update(obj.__dict__)
+        return clone
+
+class Game:
+    def __init__(self, profile=False, seed=None, record=None, replay=None, render_fps=FPS, quality=None,
+                 telemetry=None, startup_profile=False, pipelined=False):
+        self.startup = StartupProfile()
+        self.startup_profile = startup_profile
+        self.startup.mark("imports")
+        # Only the display: nothing plays sound, and fonts start on first use
+        pygame.display.init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Hill Climb Racing - Custom Character")
+        # The car image loads from disk while the rest starts up
+        assets.preload_image(CAR_IMAGE, CAR_IMAGE_SIZE)
+        self.startup.mark("display")
+        self.clock = pygame.time.Clock()
+        # Physics always steps at PHYSICS_HZ; render_fps only caps drawing,
+        # and 0 (as for clock.tick) means no cap, with the budget of FPS
+        self.render_fps = render_fps
+        budget_ms = 1000 / render_fps if render_fps > 0 else FRAME_BUDGET_MS
+        self.accumulator = 0.0
+        self.hud = Hud()
+        self.engine_sound_playing = False
+        self.mountain_layers = [MountainLayer(layer) for layer in range(3)]
+        self.running = True
+        self.profiler = Profiler(enabled=profile, fps=render_fps or FPS)
+        # quality=None adapts to frame time; a tier name pins that tier
+        if quality is None:
+            self.quality = QualityGovernor(budget_ms)
+        else:
+            names = [tier.name.lower() for tier in QUALITY_TIERS]
+            self.quality = QualityGovernor(budget_ms, adaptive=False, level=names.index(quality.lower()))
+        self.surfaces_allocated = 0
+        self.compositor = Compositor((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.sim = Simulation(KeyboardController(), seed=replay.seed if replay else seed)
+        self.particles = ParticleSystem(seed=self.sim.particle_seed)
+        # Input recording / replay, indexed by update tick (game over frames included)
+        self.tick = 0
+        # Set by the event loop, consumed by update(): in pipelined mode those
+        # run on different threads
+        self.restart_requested = threading.Event()
+        self.replay = replay
+        self.record_path = record
+        self.recording = InputLog(self.sim.seed) if record else None
+        self.telemetry = Telemetry(telemetry) if telemetry else None
+        # Pipelined mode steps physics on its own thread and draws the latest
+        # FrameState it handed over, with chunk surfaces of its own
+        self.pipelined = pipelined
+        self.latest_state = None
+        self.simulation_error = None
+        self.render_terrain = Terrain(generator=self.sim.generator) if pipelined else None
+        self.startup.mark("game setup")
         
-        difficulty = min(int(self.car.x / 1000) + 1, 10)
-        diff_text = self.small_font.render(f"Level: {difficulty}", True, (255, 255, 255))
-        self.screen.blit(diff_text, (20, stats_y + 130))
+    def reset(self):
+        self.sim.reset()
+        self.particles.reset(self.sim.particle_seed)
         
-    def draw_game_over(self):
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+    def snapshot(self):
+        # The simulation plus the particle pool
+        sim = self.sim.snapshot()
+        return struct.pack("<I", len(sim)) + sim + self.particles.snapshot()
+
+    def restore(self, data):
+        (length,) = struct.unpack_from("<I", data)
+        self.sim.restore(data[4:4 + length])
+        self.particles.restore(data, 4 + length)
+        self.compositor.invalidate()
         
-        title = self.font.render("GAME OVER", True, (255, 0, 0))
-        title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-        self.screen.blit(title, title_rect)
+    @property
+    def car(self):
+        return self.sim.car
         
-        reason = "Out of Fuel!" if self.car.fuel <= 0 else "Crashed!"
-        reason_text = self.small_font.render(reason, True, (255, 255, 255))
-        reason_rect = reason_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
-        self.screen.blit(reason_text, reason_rect)
+    @property
+    def terrain(self):
+        return self.sim.terrain
         
-        final_score = self.font.render(f"Final Score: {self.score}", True, (255, 215, 0))
-        score_rect = final_score.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-        self.screen.blit(final_score, score_rect)
+    @property
+    def camera(self):
+        return self.sim.camera
         
-        final_dist = self.small_font.render(f"Distance: {self.distance} m", True, (255, 255, 255))
-        dist_rect = final_dist.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 40))
-        self.screen.blit(final_dist, dist_rect)
+    @property
+    def game_over(self):
+        return self.sim.game_over
         
-        final_coins = self.small_font.render(f"Coins: {self.coin_count}", True, (255, 255, 255))
-        coins_rect = final_coins.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70))
-        self.screen.blit(final_coins, coins_rect)
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r and self.game_over:
+                    self.restart_requested.set()
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                if event.key == pygame.K_F4 and self.profiler.frames:
+                    print(f"Trace written to {self.profiler.dump_trace()}")
+                    
+    def update(self):
+        if self.replay is not None:
+            mask = self.replay.mask_at(self.tick)
+        else:
+            mask = controls_to_mask(self.sim.controller.get_controls(self.sim))
+            # Only cleared once seen, so a press landing mid-update isn't lost
+            if self.restart_requested.is_set():
+                self.restart_requested.clear()
+                mask |= RESTART_BIT
+        if self.recording is not None:
+            self.recording.record(self.tick, mask)
+        self.tick += 1
         
-        restart = self.font.render("Press R to Restart", True, (0, 255, 0))
-        restart_rect = restart.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 120))
-        self.screen.blit(restart, restart_rect)
+        if mask & RESTART_BIT:
+            self.reset()
+        if self.game_over:
+            return
+            
+        accelerating = self.sim.step(mask_to_controls(mask))
         
-    def draw(self):
-        self.draw_gradient_sky()
-        self.draw_mountains()
-        self.terrain.draw(self.screen, self.camera)
+        speed = abs(self.car.vx)
         
-        for coin in self.coins:
-            coin.draw(self.screen, self.camera)
+        if accelerating and self.car.on_ground:
+            exhaust_x = self.car.x - math.cos(self.car.angle) * 35
+            exhaust_y = self.car.y - math.sin(self.car.angle) * 35
+            
+            if speed < 2:
+                smoke_colors = [(0, 200, 0), (50, 255, 50), (100, 255, 100)]
+                particle_count = 5
+                particle_size = 8
+            elif speed < 5:
+                smoke_colors = [(255, 255, 0), (255, 200, 0), (200, 200, 0)]
+                particle_count = 8
+                particle_size = 12
+            else:
+                smoke_colors = [(255, 0, 0), (255, 100, 0), (200, 0, 0)]
+                particle_count = 12
+                particle_size = 16
+                
+            self.particles.emit(exhaust_x, exhaust_y, self.quality.particles(particle_count), smoke_colors, (2, 5), particle_size)
+            
+        self.particles.update()
         
-        for island in self.islands:
-            island.draw(self.screen, self.camera)
+        if self.game_over and self.car.crashed:
+            self.particles.emit(self.car.x, self.car.y, self.quality.particles(50), [(100, 100, 100), (150, 150, 150), (200, 200, 200)], (2, 6))
+            
+        if self.telemetry is not None:
+            self.telemetry.record(self.sim, len(self.particles))
+            if self.game_over:
+                self.telemetry.flush()
+                
+    def draw_gradient_sky(self, surface):
+        surface.blit(assets.get(("sky",), render_sky), (0, 0))
             
-        for obs in self.obstacles:
-            obs.draw(self.screen, self.camera)
+    def draw_mountains(self, surface, layers, camera):
+        for layer in layers:
+            layer.draw(surface, camera.render_x)
             
-        self.car.draw(self.screen, self.camera)
-        self.particles.draw(self.screen, self.camera)
-        self.draw_hud()
+    def draw_background(self, surface, layers, camera):
+        self.draw_gradient_sky(surface)
+        self.draw_mountains(surface, layers, camera)
         
-        # Draw milestone message in center
-        if self.milestone_timer > 0:
-            alpha = min(255, self.milestone_timer * 2)
-            big_font = pygame.font.Font(None, 72)
-            text = big_font.render(self.milestone_message, True, (255, 0, 0))
-            text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+    def draw_hud(self, world):
+        self.hud.draw(self.screen, world, self.quality)
+        
+    def draw_milestone(self, world):
+        self.hud.draw_milestone(self.screen, world)
+        
+    def draw_game_over(self, world):
+        self.hud.draw_game_over(self.screen, world)
+        
+    def visible_entities(self, index, camera):
+        # [(entity, screen_x, screen_y)] for the entities in view
+        view_min = camera.render_x - ENTITY_VIEW_MARGIN
+        view_max = camera.render_x + SCREEN_WIDTH + ENTITY_VIEW_MARGIN
+        entities = index.near(view_min, view_max)
+        if not entities:
+            return []
+        xs = np.fromiter((entity.x for entity in entities), np.float64, len(entities))
+        ys = np.fromiter((entity.y for entity in entities), np.float64, len(entities))
+        sx, sy, visible = camera.project(xs, ys, ENTITY_VIEW_MARGIN)
+        return [(entities[i], float(sx[i]), float(sy[i])) for i in np.flatnonzero(visible).tolist()]
+        
+    def draw_entities(self, visible):
+        for entity, sx, sy in visible:
+            entity.draw(self.screen, sx, sy)
             
-            # Background for text
-            bg_rect = text_rect.inflate(40, 20)
-            bg_surface = pygame.Surface((bg_rect.width, bg_rect.height))
-            bg_surface.set_alpha(min(200, alpha))
-            bg_surface.fill((0, 0, 0))
-            self.screen.blit(bg_surface, bg_rect)
+    def changing_rects(self, world, particles, coins, alpha):
+        # Screen areas that can change while the view holds still. Islands and
+        # fuel cans only vanish when picked up, inside the car's rect.
+        camera = world.camera
+        rects = [world.car.screen_rect(camera, alpha), particles.bounds(camera, alpha),
+                 self.hud.milestone_rect(world), self.profiler.rect()]
+        if self.hud.update(world, self.quality):
+            rects.append(pygame.Rect(0, 0, HUD_PANEL_WIDTH, HUD_PANEL_HEIGHT))
+        for coin, sx, sy in coins:
+            rects.append(pygame.Rect(int(sx) - coin.radius - 2, int(sy) - coin.radius - 2,
+                                     coin.radius * 2 + 4, coin.radius * 2 + 4))
+        return rects
             
-            self.screen.blit(text, text_rect)
+    def draw(self, alpha=1.0, state=None):
+        # Draws the live simulation, or a FrameState handed over by the
+        # simulation thread in pipelined mode
+        if state is None:
+            world, particles, terrain = self.sim, self.particles, self.sim.terrain
+        else:
+            world, particles, terrain = state, state.particles, self.render_terrain
+            terrain.follow(state.terrain)
+        phase = self.profiler.phase
+        camera = world.camera
+        camera.begin_frame(alpha)
+        tier = self.quality.tier
+        compositor = self.compositor
+        layers = self.mountain_layers[len(self.mountain_layers) - tier.mountain_layers:]
+        with phase("background"):
+            compositor.update_background(tuple(layer.scroll(camera.render_x) for layer in layers),
+                                         lambda surface: self.draw_background(surface, layers, camera))
+        with phase("terrain"):
+            # The grass edge is 8px wide, so it reaches 4px above the ground
+            top = terrain.highest_point(camera.render_x, camera.render_x + SCREEN_WIDTH) + camera.view()[1] - 5
+            compositor.update_terrain(camera.view(), tier.terrain_step, math.floor(top),
+                                      lambda surface: terrain.draw(surface, camera, tier.terrain_step))
         
-        if self.game_over:
-            self.draw_game_over()
+        coins = self.visible_entities(world.coins, camera)
+        frame_key = (camera.view(), world.game_over, self.profiler.enabled)
+        with phase("compose"):
+            if not compositor.begin_frame(self.screen, frame_key, self.changing_rects(world, particles, coins, alpha)):
+                return
+        
+        with phase("entities"):
+            self.draw_entities(coins)
+            self.draw_entities(self.visible_entities(world.islands, camera))
+            self.draw_entities(self.visible_entities(world.obstacles, camera))
+            
+        with phase("car"):
+            world.car.draw(self.screen, camera, alpha, tier.wheel_spokes)
+        with phase("particles"):
+            particles.draw(self.screen, camera, alpha)
+        with phase("hud"):
+            self.draw_hud(world)
+            self.draw_milestone(world)
+            if world.game_over:
+                self.draw_game_over(world)
+            
+    def frame_counters(self):
+        # Allocation totals only ever grow, so the difference is this frame's
+        allocated = (sprite_cache.renders + self.hud.text_cache.renders
+                     + Terrain.chunks_rendered + MountainLayer.strips_rendered)
+        new_surfaces = allocated - self.surfaces_allocated
+        self.surfaces_allocated = allocated
+        return {
+            "entities": len(self.sim.coins) + len(self.sim.islands) + len(self.sim.obstacles),
+            "particles": len(self.particles),
+            "terrain_points": len(self.terrain),
+            "surfaces": new_surfaces,
+            "quality": self.quality.level,
+        }
             
+    def present(self):
+        self.compositor.present(self.screen)
+        
+    def startup_mark(self, name):
+        if self.startup is not None:
+            self.startup.mark(name)
+            
+    def replay_finished(self):
+        return self.replay is not None and self.tick >= self.replay.frames
+        
+    def step_physics(self, frame_time, realtime=True):
+        # Fixed timestep: run as many PHYSICS_DT steps as real time has
+        # accumulated, then return how far we are into the next one (0..1) for
+        # the renderer to interpolate with. A long stall (window drag, debugger)
+        # is clamped, and the step cap drops whatever time is left over rather
+        # than trying to catch up and falling further behind every frame.
+        # Offline rendering (realtime=False) has no clock to fall behind, so it
+        # runs every step that frame_time makes due
+        self.accumulator += min(frame_time, 0.25) if realtime else frame_time
+        steps = 0
+        while self.accumulator >= PHYSICS_DT and not self.replay_finished():
+            if realtime and steps == MAX_PHYSICS_STEPS_PER_FRAME:
+                self.accumulator %= PHYSICS_DT
+                break
+            self.update()
+            self.accumulator -= PHYSICS_DT
+            steps += 1
+        return self.accumulator / PHYSICS_DT
+        
+    def simulate(self):
+        # Pipelined mode's simulation thread: fixed PHYSICS_DT steps against
+        # the clock, each followed by a FrameState in latest_state. That slot
+        # holds one state and a newer one replaces it, so the renderer is
+        # never shown anything older than the last step, and input (read by
+        # the controller at each step) reaches the screen within a frame.
+        # An exception stops the game and is raised again by run()
+        next_step = time.perf_counter()
+        try:
+            while self.running and not self.replay_finished():
+                now = time.perf_counter()
+                if now < next_step:
+                    time.sleep(next_step - now)
+                    continue
+                # After a stall, drop the backlog rather than racing to catch up
+                if now - next_step > MAX_PHYSICS_STEPS_PER_FRAME * PHYSICS_DT:
+                    next_step = now
+                self.update()
+                self.latest_state = FrameState(self.sim, self.particles, next_step)
+                next_step += PHYSICS_DT
+        except BaseException as error:
+            self.simulation_error = error
+            self.running = False
+
+    def latest_frame(self, now):
+        # The newest FrameState and how far past its step now is (0..1)
+        state = self.latest_state
+        return state, min(max((now - state.time) / PHYSICS_DT, 0.0), 1.0)
+        
     def run(self):
+        phase = self.profiler.phase
+        simulation = None
+        if self.pipelined:
+            self.latest_state = FrameState(self.sim, self.particles, time.perf_counter())
+            simulation = threading.Thread(target=self.simulate, name="simulation", daemon=True)
+            simulation.start()
+        last = time.perf_counter()
         while self.running:
-            self.handle_events()
-            self.update()
-            self.draw()
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            self.profiler.begin_frame()
+            now = time.perf_counter()
+            frame_time = now - last
+            last = now
+            with phase("handle_events"):
+                self.handle_events()
+            state = None
+            with phase("update"):
+                if simulation is not None:
+                    state, alpha = self.latest_frame(now)
+                else:
+                    alpha = self.step_physics(frame_time)
+            self.startup_mark("first events")
+            self.draw(alpha, state)
+            self.profiler.draw(self.screen)
+            self.startup_mark("first draw")
+            with phase("present"):
+                self.present()
+            if self.startup is not None:
+                self.startup.mark("first present")
+                if self.startup_profile:
+                    print(self.startup.report())
+                self.startup = None
+            self.quality.end_frame((time.perf_counter() - now) * 1000)
+            with phase("clock.tick"):
+                self.clock.tick(self.render_fps)
+            self.profiler.end_frame(self.frame_counters())
+            if self.replay_finished():
+                if simulation is not None:
+                    simulation.join()
+                print(f"Replay finished after {self.tick} frames, state {self.sim.state_digest()}")
+                self.running = False
             
+        if simulation is not None:
+            simulation.join()
+            if self.simulation_error is not None:
+                raise self.simulation_error
+        if self.telemetry is not None:
+            self.telemetry.close()
+            print(f"Telemetry written to {self.telemetry.directory}")
+        if self.recording is not None:
+            self.recording.save(self.record_path)
+            print(f"Input log written to {self.record_path}")
         pygame.quit()
 
+def run_headless(seconds, seed=None):
+    sim = Simulation(BotController(), seed=seed)
+    start = time.perf_counter()
+    frames = sim.run(int(seconds * PHYSICS_HZ))
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {frames / PHYSICS_HZ:.1f}s ({frames} frames) in {elapsed:.3f}s wall "
+          f"({frames / PHYSICS_HZ / max(elapsed, 1e-9):.0f}x real time)")
+    print(f"Distance: {sim.distance} m  Coins: {sim.coin_count}  Score: {sim.score}  "
+          f"Fuel: {sim.car.fuel:.1f}  Crashed: {sim.car.crashed}")
+
+def replay_headless(log):
+    # Same per-tick logic as Game.update, minus rendering and particles
+    sim = Simulation(seed=log.seed)
+    run_hash = hashlib.sha1()
+    start = time.perf_counter()
+    for tick in range(log.frames):
+        mask = log.mask_at(tick)
+        if mask & RESTART_BIT:
+            sim.reset()
+        if not sim.game_over:
+            sim.step(mask_to_controls(mask))
+        run_hash.update(sim.state_bytes())
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {log.frames} frames in {elapsed:.3f}s wall "
+          f"({log.frames / PHYSICS_HZ / max(elapsed, 1e-9):.0f}x real time)")
+    print(f"Final state {sim.state_digest()}  run {run_hash.hexdigest()}")
+    return sim
+
+def non_negative_int(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError("must not be negative")
+    return value
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="Hill Climb Racing")
+    parser.add_argument("--headless", type=float, metavar="SECONDS",
+                        help="run the bot without a window for SECONDS of game time and print the result")
+    parser.add_argument("--profile", action="store_true",
+                        help="start with the profiling overlay on (F3 toggles it, F4 dumps a trace)")
+    parser.add_argument("--render-fps", type=non_negative_int, default=FPS,
+                        help=f"frame rate cap for drawing, 0 for none (physics always runs at {PHYSICS_HZ} Hz)")
+    parser.add_argument("--quality", choices=[tier.name.lower() for tier in QUALITY_TIERS],
+                        help="pin a detail level instead of adapting it to the frame rate")
+    parser.add_argument("--telemetry", metavar="DIR",
+                        help="log per-frame car, camera and entity state to .npz files in DIR")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="step physics on its own thread while the main thread draws")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print how long each startup phase took up to the first frame")
+    parser.add_argument("--seed", type=int, help="master seed for spawning, particles and camera shake")
+    parser.add_argument("--record", metavar="FILE", help="write this session's inputs to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="replay a recorded session in the window")
+    parser.add_argument("--replay-headless", metavar="FILE",
+                        help="replay a recorded session without a window as fast as possible")
+    args = parser.parse_args()
+    if args.headless is not None:
+        run_headless(args.headless, args.seed)
+    elif args.replay_headless:
+        replay_headless(InputLog.load(args.replay_headless))
+    else:
+        replay = InputLog.load(args.replay) if args.replay else None
+        game = Game(profile=args.profile, seed=args.seed, record=args.record, replay=replay,
+                    render_fps=args.render_fps, quality=args.quality, telemetry=args.telemetry,
+                    startup_profile=args.startup_profile, pipelined=args.pipelined)
+        game.run()
@@ -0,0 +1,140 @@
+import os
+
+# Frames are drawn offscreen, never in a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+from game import FPS, PHYSICS_HZ, QUALITY_TIERS, SCREEN_HEIGHT, SCREEN_WIDTH, Game, InputLog
+
+# Offline rendering of recorded sessions. The replay is stepped and drawn by
+# Game.draw as fast as it goes (no clock.tick), and every frame's pixels are
+# handed in small chunks to a process pool that encodes them, so drawing the
+# next frames overlaps with encoding the last ones:
+#
+#     python render.py session.hcil --output frames/               # frame_000000.png, ...
+#     python render.py session.hcil --output video/ --format raw   # chunk_000000.rgb, ...
+#
+# Raw chunks are headerless RGB24 frames back to back and concatenate into one
+# stream, e.g. for ffmpeg:
+#
+#     cat video/chunk_*.rgb | ffmpeg -f rawvideo -pixel_format rgb24 \
+#         -video_size 1200x700 -framerate 60 -i - session.mp4
+
+FORMATS = ("png", "raw")
+
+def encode_chunk(task):
+    # Runs in a worker: writes one chunk of frames and returns its frame count
+    directory, kind, first, frames = task
+    size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+    if kind == "png":
+        for i, data in enumerate(frames):
+            surface = pygame.image.frombytes(data, size, "RGB")
+            pygame.image.save(surface, os.path.join(directory, f"frame_{first + i:06d}.png"))
+    else:
+        with open(os.path.join(directory, f"chunk_{first:06d}.rgb"), "wb") as f:
+            f.writelines(frames)
+    return len(frames)
+
+class FrameEncoder:
+    # Bounded handoff to the encoding pool: at most max_pending chunks are in
+    # flight, and submitting past that waits for the oldest to finish, so a
+    # slow encoder holds the renderer back instead of piling frames up in
+    # memory
+    def __init__(self, directory, kind="png", workers=None, chunk_frames=4, max_pending=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.kind = kind
+        self.chunk_frames = chunk_frames
+        workers = workers or os.cpu_count()
+        self.max_pending = max_pending or workers * 2
+        # Spawned rather than forked, so workers don't inherit SDL's display state
+        self.executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        self.pending = deque()
+        self.frames = []
+        self.first = 0
+        self.written = 0
+
+    def add(self, data):
+        self.frames.append(data)
+        if len(self.frames) == self.chunk_frames:
+            self.submit()
+
+    def submit(self):
+        if len(self.pending) == self.max_pending:
+            self.written += self.pending.popleft().result()
+        task = (self.directory, self.kind, self.first, self.frames)
+        self.pending.append(self.executor.submit(encode_chunk, task))
+        self.first += len(self.frames)
+        self.frames = []
+
+    def close(self):
+        if self.frames:
+            self.submit()
+        while self.pending:
+            self.written += self.pending.popleft().result()
+        self.executor.shutdown()
+        return self.written
+
+def render_session(log, directory, kind="png", fps=FPS, quality="high", workers=None, chunk_frames=4,
+                   max_frames=None):
+    # A pinned quality tier keeps the output independent of how fast this
+    # machine renders; fps is frames per second of game time, with physics
+    # stepping at PHYSICS_HZ and frames interpolated in between
+    game = Game(replay=log, quality=quality)
+    encoder = FrameEncoder(directory, kind, workers, chunk_frames)
+    frames = 0
+    start = time.perf_counter()
+    draw_time = 0.0
+    try:
+        while not game.replay_finished() and (max_frames is None or frames < max_frames):
+            drawn = time.perf_counter()
+            game.draw(game.step_physics(1 / fps, realtime=False))
+            game.present()
+            data = pygame.image.tobytes(game.screen, "RGB")
+            draw_time += time.perf_counter() - drawn
+            encoder.add(data)
+            frames += 1
+            if frames % (fps * 10) == 0:
+                elapsed = time.perf_counter() - start
+                print(f"  {frames} frames ({frames / fps:.0f}s of game time), {frames / elapsed:.1f} fps")
+    finally:
+        written = encoder.close()
+        pygame.quit()
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {frames} frames ({game.tick / PHYSICS_HZ:.1f}s of game time) in {elapsed:.2f}s: "
+          f"{frames / max(elapsed, 1e-9):.1f} fps overall, {frames / max(draw_time, 1e-9):.1f} fps drawing")
+    print(f"{written} frames written to {directory}")
+    return frames
+
+def positive_int(text):
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a recorded session to image files without a window")
+    parser.add_argument("replay", help="input log written by game.py --record")
+    parser.add_argument("--output", default="frames", help="directory for the frames")
+    parser.add_argument("--format", choices=FORMATS, default="png",
+                        help="one PNG per frame, or raw RGB24 chunks")
+    parser.add_argument("--fps", type=positive_int, default=FPS, help="output frames per second of game time")
+    parser.add_argument("--quality", choices=[tier.name.lower() for tier in QUALITY_TIERS], default="high")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="encoding processes")
+    parser.add_argument("--chunk-frames", type=int, default=4, help="frames per task sent to a worker")
+    parser.add_argument("--max-frames", type=int, help="stop after this many frames")
+    args = parser.parse_args()
+    render_session(InputLog.load(args.replay), args.output, args.format, args.fps, args.quality,
+                   args.workers, args.chunk_frames, args.max_frames)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import os
+
+# Keep every worker process quiet and off the display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import itertools
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from game import (
+    BotController, Controls, ScriptedController, Simulation, TerrainGenerator, PHYSICS_HZ,
+    GRAVITY, MAX_TILT_ANGLE, MAX_LANDING_SPEED, FUEL_CONSUMPTION, JUMP_FORCE,
+)
+
+# Physics-constant sweeps. Every configuration (a set of Car constants plus a
+# terrain seed) is run as a headless Simulation on a process pool, and the
+# per-run results are written column by column to an .npz file:
+#
+#     results = np.load("sweep.npz")
+#     results["gravity"], results["distance"], results["crash_cause"], ...
+#
+# All runs share one spawn seed, so configurations are compared on the same
+# coin and fuel placements.
+
+# name -> (default, default random range)
+PARAMETERS = {
+    "gravity": (GRAVITY, (0.3, 0.8)),
+    "max_tilt_angle": (MAX_TILT_ANGLE, (45, 110)),
+    "max_landing_speed": (MAX_LANDING_SPEED, (8, 25)),
+    "fuel_consumption": (FUEL_CONSUMPTION, (0.02, 0.1)),
+    "jump_force": (JUMP_FORCE, (6, 18)),
+}
+
+CONTROLLERS = {
+    "bot": lambda: BotController(),
+    "fast_bot": lambda: BotController(max_speed=8),
+    "throttle": lambda: ScriptedController([Controls(throttle=True)]),
+}
+
+# Recorded once per simulated second
+FUEL_SAMPLE_FRAMES = PHYSICS_HZ
+
+generators = {}
+
+def run_config(config):
+    # One headless run in a worker; config is (physics, terrain_seed, controller, seed, max_frames)
+    physics, terrain_seed, controller, seed, max_frames = config
+    generator = generators.get(terrain_seed)
+    if generator is None:
+        generator = generators[terrain_seed] = TerrainGenerator(prefetch=False, seed=terrain_seed)
+    sim = Simulation(CONTROLLERS[controller](), seed=seed, physics=physics, generator=generator)
+    fuel = []
+    while not sim.game_over and sim.frame < max_frames:
+        if sim.frame % FUEL_SAMPLE_FRAMES == 0:
+            fuel.append(sim.car.fuel)
+        sim.step()
+    if sim.car.crashed:
+        cause = sim.car.crash_cause
+    elif sim.car.fuel <= 0:
+        cause = "fuel"
+    else:
+        cause = "time"
+    return {
+        "distance": sim.distance,
+        "frames": sim.frame,
+        "crash_cause": cause,
+        "coins": sim.coin_count,
+        "fuel_pickups": sim.fuel_pickups,
+        "score": sim.score,
+        "fuel": fuel,
+    }
+
+def grid_configs(grid):
+    # grid: name -> list of values; unlisted parameters stay at their defaults
+    names = list(PARAMETERS)
+    values = [grid.get(name, [PARAMETERS[name][0]]) for name in names]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+def random_configs(count, ranges, rng):
+    return [
+        {name: float(rng.uniform(*ranges.get(name, default_range)))
+         for name, (_, default_range) in PARAMETERS.items()}
+        for _ in range(count)
+    ]
+
+def columns(configs, results, max_frames):
+    cols = {name: np.array([physics[name] for physics, _ in configs], dtype=np.float64)
+            for name in PARAMETERS}
+    cols["terrain_seed"] = np.array([terrain_seed for _, terrain_seed in configs], dtype=np.int64)
+    for name in ("distance", "frames", "coins", "fuel_pickups", "score"):
+        cols[name] = np.array([result[name] for result in results], dtype=np.int64)
+    cols["crash_cause"] = np.array([result["crash_cause"] for result in results])
+
+    # Fuel per simulated second, NaN after a run ended
+    samples = -(-max_frames // FUEL_SAMPLE_FRAMES)
+    fuel = np.full((len(results), samples), np.nan, dtype=np.float32)
+    for i, result in enumerate(results):
+        fuel[i, :len(result["fuel"])] = result["fuel"]
+    cols["fuel"] = fuel
+    cols["fuel_min"] = np.nanmin(fuel, axis=1)
+    return cols
+
+def parse_values(text):
+    name, _, values = text.partition("=")
+    if name not in PARAMETERS:
+        raise argparse.ArgumentTypeError(f"unknown parameter {name!r}")
+    return name, values
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep physics constants over headless runs")
+    parser.add_argument("--grid", type=parse_values, action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="values to try for one constant (repeatable; the grid is their product)")
+    parser.add_argument("--random", type=int, metavar="N",
+                        help="sample N configurations uniformly instead of a grid")
+    parser.add_argument("--range", type=parse_values, action="append", default=[], metavar="NAME=LO:HI",
+                        help="sampling range for --random (repeatable)")
+    parser.add_argument("--terrain-seeds", type=int, default=1, metavar="N",
+                        help="run every configuration on terrain seeds 0..N-1")
+    parser.add_argument("--controller", choices=sorted(CONTROLLERS), default="bot")
+    parser.add_argument("--max-seconds", type=float, default=300, help="game-time limit per run")
+    parser.add_argument("--seed", type=int, default=1234, help="seed for spawning and --random sampling")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="sweep.npz")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.random:
+        ranges = {name: tuple(float(v) for v in values.split(":")) for name, values in args.range}
+        physics = random_configs(args.random, ranges, rng)
+    else:
+        grid = {name: [float(v) for v in values.split(",")] for name, values in args.grid}
+        physics = grid_configs(grid)
+    configs = [(p, terrain_seed) for p in physics for terrain_seed in range(args.terrain_seeds)]
+    max_frames = int(args.max_seconds * PHYSICS_HZ)
+    tasks = [(p, terrain_seed, args.controller, args.seed, max_frames) for p, terrain_seed in configs]
+
+    print(f"{len(tasks)} runs on {args.workers} workers")
+    start = time.perf_counter()
+    results = []
+    # Small batches per task keep IPC overhead down without starving workers at the end
+    chunksize = max(1, len(tasks) // (args.workers * 8))
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for result in executor.map(run_config, tasks, chunksize=chunksize):
+            results.append(result)
+            if len(results) % 100 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"  {len(results)}/{len(tasks)} runs, {len(results) / elapsed:.1f} runs/s")
+    elapsed = time.perf_counter() - start
+
+    np.savez(args.output, **columns(configs, results, max_frames))
+    causes, counts = np.unique([result["crash_cause"] for result in results], return_counts=True)
+    print(f"{len(results)} runs in {elapsed:.1f}s ({len(results) / max(elapsed, 1e-9):.1f} runs/s)")
+    print("Ended by: " + ", ".join(f"{cause} {count}" for cause, count in zip(causes, counts)))
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()